@@ -3,7 +3,7 @@ Pydantic-based configuration management for the Deep Newsletter application.
 Handles environment variables with validation and type safety.
 """
 
-from typing import Optional
+from typing import Literal, Optional
 from functools import cached_property
 from pydantic import Field, EmailStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -69,11 +69,41 @@ class EmailSettings(BaseSettings):
         env="EMAIL_TO",
         description="Recipient email address"
     )
+    email_max_bytes: int = Field(
+        100_000,
+        env="EMAIL_MAX_BYTES",
+        description="Byte budget for rendered emails; longer reports are truncated (Gmail clips at ~102 KB)"
+    )
+    email_archive_url: Optional[str] = Field(
+        None,
+        env="EMAIL_ARCHIVE_URL",
+        description="Base URL where ARCHIVE_DIR is published; oversized emails link to their full copy there "
+                    "and are only truncated when this is set"
+    )
+    email_dedupe_styles: bool = Field(
+        True,
+        env="EMAIL_DEDUPE_STYLES",
+        description="Move repeated inline styles into <style> classes (disable for clients that strip <style>)"
+    )
+    email_backend: Literal["resend", "smtp"] = Field(
+        "resend",
+        env="EMAIL_BACKEND",
+        description="Email delivery backend"
+    )
+    smtp_host: Optional[str] = Field(None, env="SMTP_HOST", description="SMTP server host")
+    smtp_port: int = Field(587, env="SMTP_PORT", description="SMTP server port")
+    smtp_username: Optional[str] = Field(None, env="SMTP_USERNAME", description="SMTP username (omit to skip AUTH)")
+    smtp_password: Optional[str] = Field(None, env="SMTP_PASSWORD", description="SMTP password")
+    smtp_starttls: bool = Field(True, env="SMTP_STARTTLS", description="Upgrade to TLS with STARTTLS when offered")
+    smtp_use_ssl: bool = Field(False, env="SMTP_USE_SSL", description="Connect with implicit TLS (usually port 465)")
+    smtp_pool_size: int = Field(4, env="SMTP_POOL_SIZE", description="Number of persistent SMTP connections")
     
     model_config = _BASE_CONFIG
     
     def is_configured(self) -> bool:
         """Check if email is properly configured"""
+        if self.email_backend == "smtp":
+            return bool(self.smtp_host and self.from_email and self.to_email)
         return bool(self.resend_api_key and self.from_email and self.to_email)
 
 
@@ -82,6 +112,21 @@ class AppSettings(BaseSettings):
     
     environment: str = Field("development", description="Application environment")
     debug: bool = Field(False, description="Enable debug mode")
+    checkpoint_dir: str = Field("runs", description="Directory for per-run pipeline checkpoints")
+    digest_dir: str = Field("digests", description="Directory of reports queued for digests, one folder per edition")
+    digest_edition: Literal["daily", "weekly"] = Field(
+        "weekly",
+        description="How often digests go out; reports queued in the same day or ISO week share an edition"
+    )
+    archive_dir: str = Field("archive", description="Directory of full copies of truncated emails, served at EMAIL_ARCHIVE_URL")
+    section_cache_dir: str = Field(
+        "sections",
+        description="Directory of rendered report sections and validated citations reused across editions"
+    )
+    run_deadline_seconds: float = Field(
+        1800,
+        description="Hard upper bound on a run's wall time in seconds (0 disables the deadline)"
+    )
     
     model_config = _BASE_CONFIG
     
@@ -2,19 +2,36 @@
 # It then uses the OpenAI API to run deep research on a topic and summarize the results in a newsletter style report
 
 from openai import OpenAI
+import argparse
+import json
 import os
+import re
 import getpass
 import warnings
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict
 from datetime import datetime, timedelta
 import threading
 import time
 import sys
+from typing import Optional
+from email_service.base import EmailContent
 from email_service.email_manager import EmailManager
 from config.email_config import print_email_setup_instructions
 from config.settings import get_settings
+from pipeline.checkpoint import RunCheckpoint, Stage, StageError, run_stages
+from pipeline.deadline import Deadline, DeadlineExceeded, stop_at_deadline, wait_within_deadline
+from prompts import newsletter as prompts
+from prompts.newsletter import PromptPrefix
+from prompts.usage import TokenUsage
 from pydantic import ValidationError
+from reports.model import REPORT_SCHEMA, Report, parse_report
+from reports.render import render_report_html
+from reports.sections import SectionStore
 from tenacity import (
+    RetryError,
     retry,
+    retry_if_not_exception_type,
     stop_after_attempt,
     wait_random_exponential,
 )
@@ -55,100 +72,589 @@ def stop_spinner():
     global spinner_running
     spinner_running = False
 
-def format_report_for_email(report_text: str) -> str:
+def get_openai_api_key(settings) -> str:
+    """
+    Get OpenAI API key from settings or prompt user
+    
+    Args:
+        settings: Application settings
+        
+    Returns:
+        str: OpenAI API key
+        
+    Raises:
+        ValueError: If no API key is provided
+    """
+    try:
+        # Try to get API key from settings
+        return settings.openai.api_key
+    except ValidationError:
+        # If validation fails (key not found), prompt user
+        print("OpenAI API key not found in environment variables.")
+        print("Please add OPENAI_API_KEY to your .env file or enter it below.")
+        api_key = getpass.getpass("Enter your OpenAI API key: ")
+        
+        if not api_key:
+            raise ValueError("OpenAI API key is required. Please set OPENAI_API_KEY in your .env file or provide it when prompted.")
+        
+        return api_key
+
+DEEP_RESEARCH_MODEL = "o4-mini-deep-research-2025-06-26"
+
+# Fast model used to outline sub-stories, and model used to merge sub-story research
+OUTLINE_MODEL = "gpt-4.1-mini"
+SYNTHESIS_MODEL = "gpt-4.1"
+
+# Fast model used to convert a deep research report into the structured report schema
+STRUCTURE_MODEL = "gpt-4.1-mini"
+
+# Responses API text format requesting output that matches the report schema exactly
+REPORT_FORMAT = {
+    "format": {
+        "type": "json_schema",
+        "name": "newsletter_report",
+        "schema": REPORT_SCHEMA,
+        "strict": True,
+    }
+}
+
+def get_date_window(days: int = 7) -> tuple:
+    """
+    Get the default research window, ending yesterday
+    
+    Args:
+        days: Length of the window in days
+        
+    Returns:
+        tuple: (start date, end date) formatted as YYYY-MM-DD
+    """
+    date = datetime.now() - timedelta(days=1)
+    date_cutoff = date - timedelta(days=days)
+    return date_cutoff.strftime("%Y-%m-%d"), date.strftime("%Y-%m-%d")
+
+# Implement exponential backoff & retry for the OpenAI API call
+# Retries are shortened or skipped when they could not finish before the run's deadline
+@retry(
+    wait=wait_within_deadline(wait_random_exponential(min=1, max=60)),
+    stop=stop_after_attempt(6) | stop_at_deadline(),
+    retry=retry_if_not_exception_type(DeadlineExceeded)
+)
+def completion_with_backoff(client: OpenAI, deadline: Optional[Deadline] = None, **kwargs):
+    if deadline is not None:
+        kwargs["timeout"] = deadline.timeout(action="call the OpenAI API")
+    return client.responses.create(**kwargs)
+
+def build_input(prefix: Optional[PromptPrefix], user_query: str) -> list:
+    """
+    Build the Responses API input: the stable prefix first, then the variable query
+    
+    Args:
+        prefix: Developer instructions, or None when continuing a conversation that already has them
+        user_query: User request
+        
+    Returns:
+        list: Input messages
     """
-    Format the report text for HTML email display
+    messages = []
+    if prefix is not None:
+        messages.append({
+          "role": "developer",
+          "content": [
+            {
+              "type": "input_text",
+              "text": prefix.text,
+            }
+          ]
+        })
+    return messages + [
+      {
+        "role": "user",
+        "content": [
+          {
+            "type": "input_text",
+            "text": user_query,
+          }
+        ]
+      }
+    ]
+
+def deep_research_call(client: OpenAI, prefix: PromptPrefix, user_query: str, deadline: Optional[Deadline] = None,
+                       previous_response_id: Optional[str] = None):
+    """
+    Run a single deep research call with web search
     
     Args:
-        report_text: Raw report text from OpenAI
+        client: OpenAI client
+        prefix: Developer instructions
+        user_query: Research request
+        deadline: Run deadline bounding the call and its retries
+        previous_response_id: Continue this conversation, whose input already
+            holds the prefix; its whole input and output are billed again as input
         
     Returns:
-        str: HTML formatted report
+        The raw OpenAI response
+    """
+    chain = {"previous_response_id": previous_response_id} if previous_response_id else {}
+    return completion_with_backoff(
+      client,
+      deadline=deadline,
+      model=DEEP_RESEARCH_MODEL,
+      input=build_input(None if previous_response_id else prefix, user_query),
+      prompt_cache_key=prefix.cache_key,
+      **chain,
+      reasoning={
+        "summary": "auto"
+      },
+      tools=[
+        {
+          "type": "web_search_preview"
+        }
+      ]
+    )
+
+def request_deep_research(client: OpenAI, topic: str, start_date: str, end_date: str,
+                          deadline: Optional[Deadline] = None, previous_response_id: Optional[str] = None):
     """
-    import re
+    Run a deep research call on a topic
     
-    def convert_markdown_links(text):
-        """Convert markdown links to HTML links"""
-        # Pattern to match markdown links: [text](url)
-        pattern = r'\[([^\]]+)\]\(([^)]+)\)'
+    Args:
+        client: OpenAI client
+        topic: The research topic
+        start_date: Start of the research window (YYYY-MM-DD)
+        end_date: End of the research window (YYYY-MM-DD)
+        deadline: Run deadline bounding the call and its retries
+        previous_response_id: Response of an earlier run on the same topic to chain onto
         
-        def replace_link(match):
-            link_text = match.group(1)
-            link_url = match.group(2)
-            return f'<a href="{link_url}" style="color: #007bff; text-decoration: none;">{link_text}</a>'
+    Returns:
+        The raw OpenAI response
+    """
+    user_query = f"Research the latest news and trends in the field of {topic} between {start_date} and {end_date}"
+    return deep_research_call(client, prompts.DEEP_RESEARCH, user_query, deadline, previous_response_id)
+
+def request_outline(client: OpenAI, topic: str, start_date: str, end_date: str, count: int,
+                    deadline: Optional[Deadline] = None, usage: Optional[TokenUsage] = None) -> list:
+    """
+    Get a quick outline of the top sub-stories for a topic
+    
+    Args:
+        client: OpenAI client
+        topic: The research topic
+        start_date: Start of the research window (YYYY-MM-DD)
+        end_date: End of the research window (YYYY-MM-DD)
+        count: Number of sub-stories to return
+        deadline: Run deadline bounding the call and its retries
+        usage: Token usage accumulator to record the call in
         
-        return re.sub(pattern, replace_link, text)
+    Returns:
+        list: One-line descriptions of the sub-stories
+    """
+    user_query = f"List the top {count} stories in the field of {topic} between {start_date} and {end_date}"
+    response = completion_with_backoff(
+      client,
+      deadline=deadline,
+      model=OUTLINE_MODEL,
+      input=build_input(prompts.OUTLINE, user_query),
+      prompt_cache_key=prompts.OUTLINE.cache_key,
+      tools=[
+        {
+          "type": "web_search_preview"
+        }
+      ]
+    )
+    if usage is not None:
+        usage.add_openai(response)
+
+    stories = []
+    for line in response.output_text.splitlines():
+        line = re.sub(r'^\s*(?:[-*•]|\d+[.)])\s*', '', line).strip()
+        if line:
+            stories.append(line)
+    return stories[:count]
+
+def research_substory(client: OpenAI, topic: str, story: str, start_date: str, end_date: str,
+                      deadline: Optional[Deadline] = None) -> dict:
+    """
+    Run a deep research call on a single sub-story
     
-    def convert_markdown_formatting(text):
-        """Convert basic markdown formatting to HTML"""
-        # Convert **bold** to <strong>
-        text = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', text)
+    Args:
+        client: OpenAI client
+        topic: The overall research topic
+        story: The sub-story to research
+        start_date: Start of the research window (YYYY-MM-DD)
+        end_date: End of the research window (YYYY-MM-DD)
+        deadline: Run deadline bounding the call and its retries
         
-        # Convert *italic* to <em>
-        text = re.sub(r'\*(.*?)\*', r'<em>\1</em>', text)
+    Returns:
+        dict: Trace record with the story, response id, duration, token usage and findings or error
+    """
+    user_query = f"Research this story in the field of {topic} between {start_date} and {end_date}: {story}"
+    started = time.monotonic()
+    try:
+        response = deep_research_call(client, prompts.SUBSTORY, user_query, deadline)
+    except Exception as e:
+        if isinstance(e, RetryError):
+            e = e.last_attempt.exception()
+        return {"story": story, "response_id": None, "seconds": round(time.monotonic() - started, 1), "error": str(e)}
+    return {
+        "story": story,
+        "response_id": response.id,
+        "seconds": round(time.monotonic() - started, 1),
+        "usage": TokenUsage().add_openai(response).to_dict(),
+        "text": response.output[-1].content[0].text,
+    }
+
+def request_parallel_research(client: OpenAI, topic: str, start_date: str, end_date: str,
+                              subquestions: int = 3, max_concurrency: int = 3,
+                              deadline: Optional[Deadline] = None) -> dict:
+    """
+    Research a topic as parallel sub-stories merged by a final synthesis call
+    
+    An outline call picks the top sub-stories, each is researched by its own deep
+    research call with bounded concurrency, and a synthesis call merges the findings
+    into a structured report. Wall time is set by the slowest sub-story.
+    
+    Args:
+        client: OpenAI client
+        topic: The research topic
+        start_date: Start of the research window (YYYY-MM-DD)
+        end_date: End of the research window (YYYY-MM-DD)
+        subquestions: Number of sub-stories to research
+        max_concurrency: Maximum number of deep research calls in flight
+        deadline: Run deadline; sub-stories not started when it expires are cancelled
         
-        # Convert `code` to <code>
-        text = re.sub(r'`(.*?)`', r'<code style="background-color: #f8f9fa; padding: 2px 4px; border-radius: 3px; font-family: monospace;">\1</code>', text)
+    Returns:
+        dict: Outline, per sub-story trace records, total token usage and the serialized synthesis response
         
-        return text
+    Raises:
+        RuntimeError: If no sub-story could be researched
+        DeadlineExceeded: If the deadline expires before the synthesis call
+    """
+    deadline = deadline or Deadline()
+    usage = TokenUsage()
+    stories = request_outline(client, topic, start_date, end_date, subquestions, deadline=deadline, usage=usage)
+    if not stories:
+        raise RuntimeError("The outline call returned no sub-stories")
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency))
+    futures = [
+        executor.submit(research_substory, client, topic, story, start_date, end_date, deadline)
+        for story in stories
+    ]
+    # In-flight calls end on their own request timeout; queued ones are cancelled
+    wait(futures, timeout=deadline.wait_timeout())
+    executor.shutdown(wait=False, cancel_futures=True)
+    deadline.check("merge the sub-story research")
+    subreports = [future.result() for future in futures]
+    for subreport in subreports:
+        usage.merge(TokenUsage(**subreport.get("usage", {})))
+
+    findings = [subreport for subreport in subreports if "text" in subreport]
+    if not findings:
+        raise RuntimeError("All sub-story research calls failed")
+
+    notes = "\n\n".join(
+        f"## Sub-story {i}: {subreport['story']}\n\n{subreport['text']}"
+        for i, subreport in enumerate(findings, 1)
+    )
+    user_query = (
+        f"Merge the following research on {topic} between {start_date} and {end_date} into one report.\n\n{notes}"
+    )
+    synthesis = completion_with_backoff(
+      client,
+      deadline=deadline,
+      model=SYNTHESIS_MODEL,
+      input=build_input(prompts.SYNTHESIS, user_query),
+      prompt_cache_key=prompts.SYNTHESIS.cache_key,
+      text=REPORT_FORMAT
+    )
+    usage.add_openai(synthesis)
+
+    return {
+        "mode": "parallel",
+        "outline": stories,
+        "subreports": subreports,
+        "usage": usage.to_dict(),
+        "synthesis": synthesis.model_dump(mode="json"),
+    }
+
+def request_structured_report(client: OpenAI, report_text: str, deadline: Optional[Deadline] = None,
+                              usage: Optional[TokenUsage] = None) -> Report:
+    """
+    Convert a free-form deep research report into the structured report schema
     
-    # Split the report into lines
-    lines = report_text.strip().split('\n')
-    html_parts = []
+    Deep research calls return prose, so a fast model copies the report into the
+    schema with structured outputs instead of the report being parsed with regexes.
     
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
+    Args:
+        client: OpenAI client
+        report_text: Raw report text from the deep research call
+        deadline: Run deadline bounding the call and its retries
+        usage: Token usage accumulator to record the call in
         
-        # Convert markdown formatting first
-        line = convert_markdown_formatting(line)
+    Returns:
+        Report: The structured report
         
-        # Convert markdown links
-        line = convert_markdown_links(line)
+    Raises:
+        ValueError: If the model refused or returned output that does not match the schema
+    """
+    response = completion_with_backoff(
+      client,
+      deadline=deadline,
+      model=STRUCTURE_MODEL,
+      input=build_input(prompts.STRUCTURE, report_text),
+      prompt_cache_key=prompts.STRUCTURE.cache_key,
+      text=REPORT_FORMAT
+    )
+    if usage is not None:
+        usage.add_openai(response)
+    return parse_report(response.output_text)
+
+def format_research_trace(subreports: list) -> str:
+    """
+    Format the per sub-story trace appended to parallel reports
+    
+    Args:
+        subreports: Trace records from request_parallel_research
         
-        # Check if it's a title (usually in all caps or has special formatting)
-        if line.isupper() or line.startswith('#') or len(line) < 100:
-            html_parts.append(f'<h2 style="color: #007bff; margin-top: 20px; margin-bottom: 10px;">{line}</h2>')
-        # Check if it's a headline (starts with number or bullet)
-        elif line.startswith(('1.', '2.', '3.', '4.', '5.', '-', '•')):
-            html_parts.append(f'<div class="headline"><h3>{line}</h3></div>')
-        # Regular paragraph
+    Returns:
+        str: Trace section, one line per sub-call
+    """
+    lines = ["Research trace"]
+    for subreport in subreports:
+        if subreport.get("response_id"):
+            lines.append(f"- {subreport['story']}: response {subreport['response_id']} ({subreport['seconds']}s)")
         else:
-            html_parts.append(f'<p style="margin-bottom: 15px; line-height: 1.6;">{line}</p>')
+            lines.append(f"- {subreport['story']}: failed after {subreport['seconds']}s ({subreport['error']})")
+    return "\n".join(lines)
+
+def extract_report_text(response_data: dict) -> str:
+    """
+    Extract the report text from a serialized deep research response
     
-    return '\n'.join(html_parts)
+    Args:
+        response_data: The response as a dict (e.g. from `response.model_dump()`)
+        
+    Returns:
+        str: Raw report text from the model
+    """
+    return response_data["output"][-1]["content"][0]["text"]
 
-def get_openai_api_key(settings) -> str:
+def research_usage(research_data: dict, structure_data: Optional[dict] = None) -> TokenUsage:
     """
-    Get OpenAI API key from settings or prompt user
+    Get the token usage recorded in a run's checkpoints
     
     Args:
-        settings: Application settings
+        research_data: Contents of the research stage checkpoint
+        structure_data: Contents of the structure stage checkpoint, if any
         
     Returns:
-        str: OpenAI API key
+        TokenUsage: Usage over all model calls of the research and structure stages
+    """
+    if research_data.get("mode") == "parallel":
+        usage = TokenUsage(**research_data.get("usage", {}))
+    else:
+        usage = TokenUsage().add_openai(research_data)
+    if structure_data is not None:
+        usage.merge(TokenUsage(**structure_data.get("usage", {})))
+    return usage
+
+def run_deep_research(client: OpenAI, topic: str, start_date: str, end_date: str,
+                      deadline: Optional[Deadline] = None, store: Optional[SectionStore] = None) -> tuple:
+    """
+    Run a deep research call on a topic and return the structured report and its HTML
+    
+    Args:
+        client: OpenAI client
+        topic: The research topic
+        start_date: Start of the research window (YYYY-MM-DD)
+        end_date: End of the research window (YYYY-MM-DD)
+        deadline: Run deadline bounding the calls and their retries
+        store: Section store to reuse unchanged report sections from
         
-    Raises:
-        ValueError: If no API key is provided
+    Returns:
+        tuple: (Report, HTML formatted report)
     """
-    try:
-        # Try to get API key from settings
-        return settings.openai.api_key
-    except ValidationError:
-        # If validation fails (key not found), prompt user
-        print("OpenAI API key not found in environment variables.")
-        print("Please add OPENAI_API_KEY to your .env file or enter it below.")
-        api_key = getpass.getpass("Enter your OpenAI API key: ")
+    response = request_deep_research(client, topic, start_date, end_date, deadline)
+    report = request_structured_report(client, response.output[-1].content[0].text, deadline)
+    return report, render_report_html(report, store, deadline=deadline)
+
+def build_stages(settings, email_manager: EmailManager, topic: str, start_date: str, end_date: str,
+                 parallel: Optional[dict] = None, deadline: Optional[Deadline] = None,
+                 previous_response_id: Optional[str] = None, run_id: Optional[str] = None) -> list:
+    """
+    Build the checkpointed pipeline stages for a deep research run
+    
+    Args:
+        settings: Application settings
+        email_manager: Email manager used for rendering and delivery
+        topic: The research topic
+        start_date: Start of the research window (YYYY-MM-DD)
+        end_date: End of the research window (YYYY-MM-DD)
+        parallel: Options for request_parallel_research (subquestions, max_concurrency),
+            or None for a single deep research call
+        deadline: Run deadline passed to every client call
+        previous_response_id: Response of an earlier run on the same topic to chain onto
+        run_id: Run ID, used to name the archived copy of an oversized email
         
-        if not api_key:
-            raise ValueError("OpenAI API key is required. Please set OPENAI_API_KEY in your .env file or provide it when prompted.")
+    Returns:
+        list: Stages in execution order
+    """
+    def research(outputs):
+        # tenacity handles retries within the deadline, so disable the client's own
+        client = OpenAI(api_key=get_openai_api_key(settings), max_retries=0)
+        spinner_thread = start_spinner()
+        try:
+            if parallel is not None:
+                result = request_parallel_research(
+                    client, topic, start_date, end_date, deadline=deadline, **parallel
+                )
+                return json.dumps(result, indent=2)
+            response = request_deep_research(client, topic, start_date, end_date, deadline, previous_response_id)
+        finally:
+            # Stop the spinner animation
+            stop_spinner()
+        return response.model_dump_json(indent=2)
+
+    def structure(outputs):
+        research_data = json.loads(outputs["research"])
+        usage = TokenUsage()
+        if research_data.get("mode") == "parallel":
+            # The synthesis call already returned the structured report
+            report = parse_report(extract_report_text(research_data["synthesis"]))
+        else:
+            client = OpenAI(api_key=get_openai_api_key(settings), max_retries=0)
+            report = request_structured_report(client, extract_report_text(research_data), deadline, usage)
+        return json.dumps({"report": report.to_dict(), "usage": usage.to_dict()}, indent=2, ensure_ascii=False)
+
+    def report(outputs):
+        report_text = parse_report(json.loads(outputs["structure"])["report"]).to_text()
+        research_data = json.loads(outputs["research"])
+        if research_data.get("mode") == "parallel":
+            return report_text + "\n\n" + format_research_trace(research_data["subreports"])
+        return report_text
+
+    def format_html(outputs):
+        research_data = json.loads(outputs["research"])
+        return render_report_html(
+            parse_report(json.loads(outputs["structure"])["report"]),
+            SectionStore(settings.section_cache_dir),
+            deadline=deadline,
+            trace=research_data.get("subreports") if research_data.get("mode") == "parallel" else None
+        )
+
+    def render(outputs):
+        if not email_manager.is_available():
+            return None
+        email_content = email_manager.render_research_report(
+            topic=topic,
+            date=end_date,
+            content=outputs["format"],
+            archive_name=run_id
+        )
+        return json.dumps(asdict(email_content), ensure_ascii=False)
+
+    def send(outputs):
+        if "render" not in outputs:
+            return None
+        if email_manager.digest:
+            # Collected on disk and sent with the other reports of the edition
+            edition = email_manager.queue_research_report(topic, end_date, outputs["format"])
+            return json.dumps({
+                "to": email_manager.recipient_email,
+                "digest_edition": edition,
+                "queued_at": datetime.now().isoformat(),
+            })
+        print("\n📧 Sending email notification...")
+        email_content = EmailContent(**json.loads(outputs["render"]))
+        if not email_manager.send_email_content(email_content, deadline=deadline):
+            raise RuntimeError("Failed to send email. Check your configuration.")
+        return json.dumps({
+            "to": email_manager.recipient_email,
+            "subject": email_content.subject,
+            "sent_at": datetime.now().isoformat(),
+        })
+
+    return [
+        Stage("research", "response.json", research),
+        Stage("structure", "report.json", structure),
+        Stage("report", "report.txt", report),
+        Stage("format", "content.html", format_html),
+        Stage("render", "email.json", render),
+        Stage("send", "receipt.json", send),
+    ]
+
+def flush_digest_editions(email_manager: EmailManager, edition: Optional[str] = None,
+                          deadline: Optional[Deadline] = None) -> dict:
+    """
+    Send queued digests, once per edition
+    
+    Args:
+        email_manager: Email manager holding the digest queue
+        edition: Edition to send, or None for every edition whose window has ended
+        deadline: Run deadline bounding the sends
         
-        return api_key
+    Returns:
+        dict: Send result per recipient, per edition
+    """
+    editions = [edition] if edition else email_manager.closed_editions()
+    results = {}
+    for edition in editions:
+        print(f"\n📧 Sending the {edition} digests...")
+        results[edition] = email_manager.flush_digests(edition, deadline=deadline)
+    return results
 
 def main():
     """Main function to run the deep research bot"""
     
+    parser = argparse.ArgumentParser(description="Run deep research on a topic and email the report")
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Resume a previous run, skipping stages that already completed"
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Research the top sub-stories in parallel and merge them into one report"
+    )
+    parser.add_argument(
+        "--subquestions",
+        type=int,
+        default=3,
+        help="Number of sub-stories to research in parallel mode (default: 3)"
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=3,
+        help="Maximum deep research calls in flight in parallel mode (default: 3)"
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Hard upper bound on the run's wall time (default: RUN_DEADLINE_SECONDS, 0 disables)"
+    )
+    parser.add_argument(
+        "--follow-up",
+        metavar="RUN_ID",
+        help="Research an earlier run's topic again, continuing that run's conversation so the new report "
+             "builds on the previous one (the whole earlier conversation is billed again as input)"
+    )
+    parser.add_argument(
+        "--digest",
+        action="store_true",
+        help="Queue the report for this edition's digest instead of emailing it now"
+    )
+    parser.add_argument(
+        "--flush-digests",
+        nargs="?",
+        const="",
+        metavar="EDITION",
+        help="Send the queued digests of EDITION, or of every edition whose window has ended, and exit"
+    )
+    args = parser.parse_args()
+    
     try:
         # Load application settings
         settings = get_settings()
@@ -168,119 +674,103 @@ def main():
     if not email_manager.is_available():
         print_email_setup_instructions()
     
-    # Get OpenAI API key
-    try:
-        api_key = get_openai_api_key(settings)
-    except ValueError as e:
-        print(f"❌ {e}")
+    if args.flush_digests is not None:
+        sent = flush_digest_editions(
+            email_manager,
+            args.flush_digests or None,
+            Deadline(args.deadline if args.deadline is not None else settings.run_deadline_seconds)
+        )
+        if not sent:
+            print("📭 No digest editions are waiting to be sent")
         return
     
-    # Get the latest news on the user's provided topic
-    topic = input("Enter a topic to research: ")
-    date = datetime.now() - timedelta(days=1)
-    date_cutoff = date - timedelta(days=7)
-    date_formatted = date.strftime("%Y-%m-%d")
-    date_cutoff_formatted = date_cutoff.strftime("%Y-%m-%d")
-
-    # Initialize the OpenAI client
-    client = OpenAI(api_key=api_key)
-
-    # Implement exponential backoff & retry for the OpenAI API call
-    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
-    def completion_with_backoff(**kwargs):
-        return client.responses.create(**kwargs)
-
-    system_message = """
-    You are a professional journalist and researcher preparing a structured, data-driven report on behalf of your client. 
-
-    Your task is to research the user's provided topic and return a newsletter style report on news and trends in the topic within 
-    the user's provided time frame. The report should be in a format that is easy to read and understand.
-
-    The report should be in the following format:
-    - Title
-    - Top 3 headlines with 1 sentence summary for each headline
-    - For each headline topic, max 200 words of analysis
-
-    Be very concise and analytical. Avoid generalities, and ensure that each section is supported by by reputable sources.
-
-    Constrain the output to within 1 week of the user's provided date. 
-    If there is no news in the last week, return a message saying that there is no news in the last week.
-    """
-
-    user_query = f"Research the latest news and trends in the field of {topic} between {date_cutoff_formatted} and {date_formatted}"
+    if args.resume:
+        try:
+            checkpoint = RunCheckpoint.load(args.resume, settings.checkpoint_dir)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            return
+        run = checkpoint.metadata
+        topic = run["topic"]
+        date_cutoff_formatted, date_formatted = run["start_date"], run["end_date"]
+        parallel = run.get("parallel")
+        previous_response_id = run.get("previous_response_id")
+        digest = run.get("digest", False)
+        print(f"\n♻️  Resuming run {checkpoint.run_id}")
+    else:
+        previous_response_id = None
+        if args.follow_up and args.parallel:
+            print("❌ --follow-up chains a single deep research call and cannot be combined with --parallel")
+            return
+        if args.follow_up:
+            # Chaining replays the earlier run's whole input and output, so it is only
+            # worth it for the same topic; other topics share the instructions through
+            # prompt_cache_key without carrying an unrelated conversation along
+            try:
+                previous = RunCheckpoint.load(args.follow_up, settings.checkpoint_dir)
+                previous_response_id = previous.read_json("response.json")["id"]
+            except (FileNotFoundError, KeyError) as e:
+                print(f"❌ Cannot follow up on run '{args.follow_up}': {e}")
+                return
+            topic = previous.metadata["topic"]
+            print(f"🔗 Following up on run {args.follow_up}")
+        else:
+            # Get the latest news on the user's provided topic
+            topic = input("Enter a topic to research: ")
+        date_cutoff_formatted, date_formatted = get_date_window()
+        parallel = None
+        if args.parallel:
+            parallel = {"subquestions": args.subquestions, "max_concurrency": args.max_concurrency}
+        digest = args.digest
+        checkpoint = RunCheckpoint.create(
+            settings.checkpoint_dir,
+            topic=topic,
+            start_date=date_cutoff_formatted,
+            end_date=date_formatted,
+            parallel=parallel,
+            previous_response_id=previous_response_id,
+            digest=digest
+        )
+        print(f"\n🗂️  Run ID: {checkpoint.run_id}")
+    email_manager.digest = digest
 
     print(f"\n🔍 Researching: {topic}")
     print(f"📅 Date range: {date_cutoff_formatted} to {date_formatted}")
     print()
 
-    # Start the spinner animation
-    spinner_thread = start_spinner()
+    deadline = Deadline(args.deadline if args.deadline is not None else settings.run_deadline_seconds)
+    if deadline.seconds:
+        print(f"⏱️  Deadline: {deadline.seconds:.0f}s")
 
+    stages = build_stages(
+        settings, email_manager, topic, date_cutoff_formatted, date_formatted, parallel, deadline,
+        previous_response_id, checkpoint.run_id
+    )
     try:
-        response = completion_with_backoff(
-          model="o4-mini-deep-research-2025-06-26",
-          input=[
-            {
-              "role": "developer",
-              "content": [
-                {
-                  "type": "input_text",
-                  "text": system_message,
-                }
-              ]
-            },
-            {
-              "role": "user",
-              "content": [
-                {
-                  "type": "input_text",
-                  "text": user_query,
-                }
-              ]
-            }
-          ],
-          reasoning={
-            "summary": "auto"
-          },
-          tools=[
-            {
-              "type": "web_search_preview"
-            }
-          ]
-        )
-    finally:
-        # Stop the spinner animation
-        stop_spinner()
-
-    # Get the research report
-    report_text = response.output[-1].content[0].text
+        outputs = run_stages(checkpoint, stages, deadline)
+    except StageError as e:
+        print(f"❌ {e}")
+        print(f"   Completed stages are saved in {checkpoint.directory}")
+        print(f"   Resume with: python deep_research_bot.py --resume {checkpoint.run_id}")
+        return
     
     # Display the report
     print("\n" + "="*60)
     print("RESEARCH REPORT")
     print("="*60)
-    print(report_text)
+    print(outputs["report"])
     print("="*60)
+    usage = research_usage(json.loads(outputs["research"]), json.loads(outputs["structure"]))
+    print(f"💾 Tokens: {usage.summary()}")
     
-    # Send email notification if configured
-    if email_manager.is_available():
-        print("\n📧 Sending email notification...")
-        
-        # Format the report for email
-        html_content = format_report_for_email(report_text)
-        
-        # Send the email
-        email_sent = email_manager.send_research_report(
-            topic=topic,
-            date=date_formatted,
-            content=html_content
-        )
-        
-        if email_sent:
-            print("✅ Email sent successfully!")
-        else:
-            print("❌ Failed to send email. Check your configuration.")
-    else:
+    if "send" in outputs and digest:
+        edition = json.loads(outputs["send"])["digest_edition"]
+        print(f"🗂️  Report queued for the {edition} digest")
+        # The first digest run of a new edition sends the editions that have ended
+        flush_digest_editions(email_manager, deadline=deadline)
+    elif "send" in outputs:
+        print("✅ Email sent successfully!")
+    elif not email_manager.is_available():
         print("\n💡 Tip: Configure email notifications to receive reports in your inbox!")
         print("   Add RESEND_API_KEY, EMAIL_FROM, and EMAIL_TO to your .env file.")
 
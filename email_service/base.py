@@ -1,12 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 
 
 @dataclass
 class EmailConfig:
     """Configuration for email service"""
-    api_key: str
+    api_key: Optional[str]
     from_email: str
     from_name: Optional[str] = None
 
@@ -19,6 +19,14 @@ class EmailContent:
     text_content: Optional[str] = None
 
 
+@dataclass
+class DigestEntry:
+    """A research report queued for a recipient's digest"""
+    topic: str
+    date: str
+    content: str
+
+
 class EmailService(ABC):
     """Abstract base class for email services"""
     
@@ -26,19 +34,33 @@ class EmailService(ABC):
         self.config = config
     
     @abstractmethod
-    def send_email(self, to_email: str, content: EmailContent) -> bool:
+    def send_email(self, to_email: str, content: EmailContent, timeout: Optional[float] = None) -> bool:
         """
         Send an email using the configured service
         
         Args:
             to_email: Recipient email address
             content: Email content including subject and body
+            timeout: Maximum time in seconds to spend on the request, if supported
             
         Returns:
             bool: True if email sent successfully, False otherwise
         """
         pass
     
+    def send_bulk(self, messages: List[Tuple[str, EmailContent]], timeout: Optional[float] = None) -> List[bool]:
+        """
+        Send several emails, one after another unless the service can do better
+        
+        Args:
+            messages: (recipient, content) pairs
+            timeout: Maximum time in seconds to spend on each request, if supported
+            
+        Returns:
+            list: Send result for each message, in input order
+        """
+        return [self.send_email(to_email, content, timeout=timeout) for to_email, content in messages]
+    
     @abstractmethod
     def test_connection(self) -> bool:
         """
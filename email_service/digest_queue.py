@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from pipeline.checkpoint import atomic_write_text
+from .base import DigestEntry
+
+
+DIGEST_CADENCES = ("daily", "weekly")
+
+
+def edition_for(when: datetime, cadence: str = "weekly") -> str:
+    """
+    Edition a report queued at a given time belongs to
+
+    Edition labels sort chronologically, so editions can be compared as strings.
+
+    Args:
+        when: Time the report is queued
+        cadence: "daily" (e.g. 2025-01-06) or "weekly" (ISO week, e.g. 2025-W02)
+
+    Returns:
+        str: Edition label
+    """
+    if cadence == "daily":
+        return when.strftime("%Y-%m-%d")
+    if cadence == "weekly":
+        return when.strftime("%G-W%V")
+    raise ValueError(f"Unknown digest cadence '{cadence}', expected one of {', '.join(DIGEST_CADENCES)}")
+
+
+def _recipient_key(recipient: str) -> str:
+    return hashlib.sha256(recipient.lower().encode("utf-8")).hexdigest()[:12]
+
+
+class DigestQueue:
+    """
+    On-disk queue of reports waiting to be sent as digests, one directory per edition
+
+    Every queued report is its own file, written atomically, so separate runs can
+    queue reports for the same edition concurrently. Files are removed once the
+    digest containing them has been sent.
+    """
+
+    def __init__(self, root: str = "digests"):
+        self.root = root
+
+    def add(self, edition: str, recipient: str, entry: DigestEntry) -> str:
+        """
+        Queue a report for a recipient's digest
+
+        Args:
+            edition: Edition label
+            recipient: Recipient email address
+            entry: The report
+
+        Returns:
+            str: Path of the queued report
+        """
+        directory = os.path.join(self.root, edition, _recipient_key(recipient))
+        os.makedirs(directory, exist_ok=True)
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{uuid.uuid4().hex[:6]}.json"
+        path = os.path.join(directory, name)
+        atomic_write_text(path, json.dumps({
+            "recipient": recipient,
+            "topic": entry.topic,
+            "date": entry.date,
+            "content": entry.content,
+            "queued_at": datetime.now().isoformat(),
+        }, ensure_ascii=False))
+        return path
+
+    def editions(self) -> List[str]:
+        """Editions with queued reports, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            edition for edition in os.listdir(self.root)
+            if not edition.startswith(".") and os.path.isdir(os.path.join(self.root, edition))
+        )
+
+    def pending(self, edition: str) -> Dict[str, List[Tuple[str, DigestEntry]]]:
+        """
+        Reports queued in an edition
+
+        Args:
+            edition: Edition label
+
+        Returns:
+            dict: (path, report) pairs per recipient, in the order they were queued
+        """
+        edition_dir = os.path.join(self.root, edition)
+        pending: Dict[str, List[Tuple[str, DigestEntry]]] = {}
+        if not os.path.isdir(edition_dir):
+            return pending
+        for recipient_key in sorted(os.listdir(edition_dir)):
+            recipient_dir = os.path.join(edition_dir, recipient_key)
+            if not os.path.isdir(recipient_dir):
+                continue
+            for name in sorted(os.listdir(recipient_dir)):
+                if not name.endswith(".json") or name.startswith("."):
+                    continue
+                path = os.path.join(recipient_dir, name)
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                entry = DigestEntry(topic=data["topic"], date=data["date"], content=data["content"])
+                pending.setdefault(data["recipient"], []).append((path, entry))
+        return pending
+
+    def remove(self, paths: List[str], edition: Optional[str] = None):
+        """
+        Remove sent reports, and the edition's directories once they are empty
+
+        Args:
+            paths: Paths returned by `pending()`
+            edition: Edition label, to clean up its empty directories
+        """
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        if edition is None:
+            return
+        edition_dir = os.path.join(self.root, edition)
+        for directory in [os.path.dirname(path) for path in paths] + [edition_dir]:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
@@ -1,19 +1,42 @@
+import hashlib
 import os
-from typing import Optional
-from jinja2 import Template
-from .base import EmailService, EmailContent, EmailConfig
+from datetime import datetime
+from html import escape
+from typing import Dict, List, Optional
+from .base import DigestEntry, EmailService, EmailContent, EmailConfig
+from .digest_queue import DigestQueue, edition_for
 from .resend_service import ResendEmailService
+from .smtp_service import SMTPConfig, SMTPEmailService
+from .template_builder import DIGEST_TEMPLATE_PATH, EmailSection, EmailTemplateBuilder
 from config.settings import get_settings
 from config.email_config import print_email_setup_instructions
+from pipeline.checkpoint import atomic_write_text
+from pipeline.deadline import Deadline
 from pydantic import ValidationError
 
 
+# Upper bound for a single send request when running under a deadline
+SEND_TIMEOUT = 30
+
+
 class EmailManager:
     """Manages email sending with template rendering"""
     
-    def __init__(self):
+    def __init__(self, digest: bool = False):
+        """
+        Args:
+            digest: Queue reports per recipient and edition on disk, and send them as
+                one digest per edition on `flush_digests()` instead of one email per report
+        """
         self.email_service: Optional[EmailService] = None
         self.recipient_email: Optional[str] = None
+        self.template_builder = EmailTemplateBuilder()
+        self.digest_builder = EmailTemplateBuilder(template_path=DIGEST_TEMPLATE_PATH)
+        self.digest = digest
+        self.archive_url: Optional[str] = None
+        self.archive_dir = "archive"
+        self.digest_queue = DigestQueue()
+        self.digest_cadence = "weekly"
         self._initialize_email_service()
     
     def _initialize_email_service(self):
@@ -31,8 +54,34 @@ class EmailManager:
                     from_name=email_settings.from_name
                 )
                 
-                self.email_service = ResendEmailService(config)
+                if email_settings.email_backend == "smtp":
+                    self.email_service = SMTPEmailService(config, SMTPConfig(
+                        host=email_settings.smtp_host,
+                        port=email_settings.smtp_port,
+                        username=email_settings.smtp_username,
+                        password=email_settings.smtp_password,
+                        starttls=email_settings.smtp_starttls,
+                        use_ssl=email_settings.smtp_use_ssl,
+                        pool_size=email_settings.smtp_pool_size
+                    ))
+                else:
+                    self.email_service = ResendEmailService(config)
                 self.recipient_email = email_settings.to_email
+                # Oversized emails link to a full copy archived per email, so the
+                # builders get no fixed archive link
+                self.archive_url = email_settings.email_archive_url
+                self.archive_dir = settings.archive_dir
+                self.digest_queue = DigestQueue(settings.digest_dir)
+                self.digest_cadence = settings.digest_edition
+                self.template_builder = EmailTemplateBuilder(
+                    max_bytes=email_settings.email_max_bytes,
+                    dedupe_styles=email_settings.email_dedupe_styles
+                )
+                self.digest_builder = EmailTemplateBuilder(
+                    template_path=DIGEST_TEMPLATE_PATH,
+                    max_bytes=email_settings.email_max_bytes,
+                    dedupe_styles=email_settings.email_dedupe_styles
+                )
                 
         except ValidationError as e:
             # If validation fails, email service remains None
@@ -51,51 +100,81 @@ class EmailManager:
             return False
         return self.email_service.test_connection()
     
-    def _load_template(self) -> Template:
-        """Load the HTML email template"""
-        template_path = os.path.join(os.path.dirname(__file__), '..', 'templates', 'email_template.html')
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template_content = f.read()
-        return Template(template_content)
+    def archive_email(self, name: str, html_content: str) -> Optional[str]:
+        """
+        Write the full copy of an email to the archive directory
+        
+        Args:
+            name: File name in the archive, without extension (e.g. the run ID)
+            html_content: Full, untruncated email HTML
+            
+        Returns:
+            str: URL of the archived copy, or None if no archive URL is configured
+        """
+        if not self.archive_url:
+            return None
+        os.makedirs(self.archive_dir, exist_ok=True)
+        atomic_write_text(os.path.join(self.archive_dir, f"{name}.html"), html_content)
+        return f"{self.archive_url.rstrip('/')}/{name}.html"
     
-    def send_research_report(self, topic: str, date: str, content: str) -> bool:
+    def render_research_report(self, topic: str, date: str, content: str, archive_url: Optional[str] = None,
+                               archive_name: Optional[str] = None) -> EmailContent:
         """
-        Send a research report via email
+        Render a research report into email content without sending it
         
         Args:
             topic: The research topic
             date: The research date
             content: The research content (HTML formatted)
+            archive_url: Link to the full report, used if the email has to be truncated
+            archive_name: Archive the full email under this name if it has to be
+                truncated and no archive_url is given
+            
+        Returns:
+            EmailContent: Subject, rendered HTML and plain text fallback
+        """
+        context = {"topic": topic, "date": date, "subject": f"Deep Research Report: {topic}"}
+        # Render the pre-compiled template within the size budget
+        html_content = self.template_builder.render(content, archive_url=archive_url, **context)
+        if not archive_url and archive_name and self.template_builder.exceeds_budget(html_content):
+            archive_url = self.archive_email(archive_name, html_content)
+            if archive_url:
+                html_content = self.template_builder.render(content, archive_url=archive_url, **context)
+        
+        return EmailContent(
+            subject=f"🔍 Deep Research Report: {topic}",
+            html_content=html_content,
+            text_content=self._html_to_text(content)
+        )
+    
+    def send_email_content(self, email_content: EmailContent, deadline: Optional[Deadline] = None,
+                           to_email: Optional[str] = None) -> bool:
+        """
+        Send already rendered email content
+        
+        Args:
+            email_content: Rendered email content
+            deadline: Run deadline bounding the send request
+            to_email: Recipient, defaults to the configured recipient
             
         Returns:
             bool: True if email sent successfully, False otherwise
+            
+        Raises:
+            DeadlineExceeded: If the deadline has already passed
         """
         if not self.is_available():
             print("Email service not configured. Skipping email notification.")
             return False
         
+        timeout = deadline.timeout(cap=SEND_TIMEOUT, action="send the email") if deadline else None
+        to_email = to_email or self.recipient_email
+        
         try:
-            # Load and render template
-            template = self._load_template()
-            html_content = template.render(
-                topic=topic,
-                date=date,
-                content=content,
-                subject=f"Deep Research Report: {topic}"
-            )
-            
-            # Create email content
-            email_content = EmailContent(
-                subject=f"🔍 Deep Research Report: {topic}",
-                html_content=html_content,
-                text_content=self._html_to_text(content)
-            )
-            
-            # Send email
-            success = self.email_service.send_email(self.recipient_email, email_content)
+            success = self.email_service.send_email(to_email, email_content, timeout=timeout)
             
             if success:
-                print(f"✅ Research report sent to {self.recipient_email}")
+                print(f"✅ Research report sent to {to_email}")
             else:
                 print("❌ Failed to send email notification")
             
@@ -105,6 +184,176 @@ class EmailManager:
             print(f"❌ Error sending email: {e}")
             return False
     
+    def send_research_report(self, topic: str, date: str, content: str, archive_url: Optional[str] = None) -> bool:
+        """
+        Send a research report via email
+        
+        In digest mode the report is queued for the configured recipient instead,
+        and delivered with the other queued reports by `flush_digests()`.
+        
+        Args:
+            topic: The research topic
+            date: The research date
+            content: The research content (HTML formatted)
+            archive_url: Link to the full report, used if the email has to be truncated
+            
+        Returns:
+            bool: True if email sent (or queued) successfully, False otherwise
+        """
+        if not self.is_available():
+            print("Email service not configured. Skipping email notification.")
+            return False
+        
+        if self.digest:
+            self.queue_research_report(topic, date, content)
+            return True
+        
+        try:
+            email_content = self.render_research_report(topic, date, content, archive_url)
+        except Exception as e:
+            print(f"❌ Error sending email: {e}")
+            return False
+        
+        return self.send_email_content(email_content)
+    
+    def current_edition(self) -> str:
+        """Edition that reports queued now belong to"""
+        return edition_for(datetime.now(), self.digest_cadence)
+    
+    def queue_research_report(self, topic: str, date: str, content: str, recipient: Optional[str] = None,
+                              edition: Optional[str] = None) -> str:
+        """
+        Add a research report to a recipient's pending digest
+        
+        The queue is kept on disk, so reports from separate runs are collected
+        until the edition is flushed.
+        
+        Args:
+            topic: The research topic
+            date: The research date
+            content: The research content (HTML formatted)
+            recipient: Recipient email address, defaults to the configured recipient
+            edition: Edition to queue the report in, defaults to the current edition
+            
+        Returns:
+            str: The edition the report was queued in
+        """
+        recipient = recipient or self.recipient_email
+        edition = edition or self.current_edition()
+        self.digest_queue.add(edition, recipient, DigestEntry(topic=topic, date=date, content=content))
+        print(f"🗂️  Queued '{topic}' for the {edition} digest to {recipient}")
+        return edition
+    
+    def pending_digests(self, edition: Optional[str] = None) -> Dict[str, int]:
+        """Number of queued reports per recipient in an edition (default: the current one)"""
+        pending = self.digest_queue.pending(edition or self.current_edition())
+        return {recipient: len(entries) for recipient, entries in pending.items()}
+    
+    def closed_editions(self) -> List[str]:
+        """Editions with queued reports whose window has ended, oldest first"""
+        current = self.current_edition()
+        return [edition for edition in self.digest_queue.editions() if edition < current]
+    
+    def render_digest(self, entries: List[DigestEntry], edition: str, archive_url: Optional[str] = None,
+                      archive_name: Optional[str] = None) -> EmailContent:
+        """
+        Render several research reports into one digest email with a table of contents
+        
+        Args:
+            entries: Reports to include, in order
+            edition: Edition label shown in the header, e.g. the date
+            archive_url: Link to the full digest, used if the email has to be truncated
+            archive_name: Archive the full digest under this name if it has to be
+                truncated and no archive_url is given
+            
+        Returns:
+            EmailContent: Subject, rendered HTML and plain text fallback
+        """
+        # Each topic gets its share of the size budget; the table of contents only
+        # lists the topics that are kept
+        sections = [
+            EmailSection(
+                item=entry,
+                opening=f'<div class="digest-section" id="topic-{i}"><h2 class="topic-title">{escape(entry.topic)}</h2>',
+                content=entry.content
+            )
+            for i, entry in enumerate(entries, 1)
+        ]
+        topics = ", ".join(entry.topic for entry in entries)
+        context = {"items_key": "reports", "edition": edition, "subject": f"Deep Research Digest: {topics}"}
+        html_content = self.digest_builder.render_sections(sections, archive_url=archive_url, **context)
+        if not archive_url and archive_name and self.digest_builder.exceeds_budget(html_content):
+            archive_url = self.archive_email(archive_name, html_content)
+            if archive_url:
+                html_content = self.digest_builder.render_sections(sections, archive_url=archive_url, **context)
+        
+        text_content = "\n\n".join(
+            f"{entry.topic} ({entry.date})\n{self._html_to_text(entry.content)}" for entry in entries
+        )
+        return EmailContent(
+            subject=f"🔍 Deep Research Digest: {topics}",
+            html_content=html_content,
+            text_content=text_content
+        )
+    
+    def flush_digests(self, edition: Optional[str] = None, deadline: Optional[Deadline] = None) -> Dict[str, bool]:
+        """
+        Send one digest per recipient with all reports queued in an edition
+        
+        Each recipient's digest is rendered once and sent as a single message, so
+        sends scale with the number of recipients rather than recipients × topics.
+        All digests are handed to the email service in one `send_bulk` call, which
+        the SMTP backend spreads over its connection pool. Recipients whose digest
+        fails to send keep their queued reports for a later flush.
+        
+        Args:
+            edition: Edition to send, defaults to the current edition
+            deadline: Run deadline bounding the send requests
+            
+        Returns:
+            dict: Send result per recipient
+            
+        Raises:
+            DeadlineExceeded: If the deadline has already passed
+        """
+        if not self.is_available():
+            print("Email service not configured. Skipping email notification.")
+            return {}
+        
+        edition = edition or self.current_edition()
+        results = {}
+        messages = []
+        queued_paths = []
+        for recipient, queued in self.digest_queue.pending(edition).items():
+            try:
+                # Recipients follow different topics, so each digest is archived separately
+                archive_name = f"digest-{edition}-{hashlib.sha256(recipient.encode('utf-8')).hexdigest()[:8]}"
+                email_content = self.render_digest([entry for _, entry in queued], edition, archive_name=archive_name)
+            except Exception as e:
+                print(f"❌ Error rendering digest for {recipient}: {e}")
+                results[recipient] = False
+                continue
+            messages.append((recipient, email_content))
+            queued_paths.append([path for path, _ in queued])
+        if not messages:
+            return results
+        
+        timeout = deadline.timeout(cap=SEND_TIMEOUT, action="send the digests") if deadline else None
+        try:
+            sent = self.email_service.send_bulk(messages, timeout=timeout)
+        except Exception as e:
+            print(f"❌ Error sending digests: {e}")
+            sent = [False] * len(messages)
+        
+        for (recipient, _), paths, success in zip(messages, queued_paths, sent):
+            results[recipient] = success
+            if success:
+                print(f"✅ {edition} digest sent to {recipient}")
+                self.digest_queue.remove(paths, edition)
+            else:
+                print(f"❌ Failed to send the {edition} digest to {recipient}")
+        return results
+    
     def _html_to_text(self, html_content: str) -> str:
         """
         Convert HTML content to plain text for email fallback
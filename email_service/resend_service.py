@@ -1,7 +1,12 @@
+import threading
 import resend
 from typing import Optional
 from .base import EmailService, EmailConfig, EmailContent
 
+# The SDK's HTTP client is a module global; sends with a timeout swap it in and
+# out under this lock so concurrent senders never see each other's client
+_http_client_lock = threading.Lock()
+
 
 class ResendEmailService(EmailService):
     """Resend email service implementation"""
@@ -10,13 +15,14 @@ class ResendEmailService(EmailService):
         super().__init__(config)
         resend.api_key = config.api_key
     
-    def send_email(self, to_email: str, content: EmailContent) -> bool:
+    def send_email(self, to_email: str, content: EmailContent, timeout: Optional[float] = None) -> bool:
         """
         Send an email using Resend
         
         Args:
             to_email: Recipient email address
             content: Email content including subject and body
+            timeout: Maximum time in seconds to spend on the request
             
         Returns:
             bool: True if email sent successfully, False otherwise
@@ -37,7 +43,17 @@ class ResendEmailService(EmailService):
             if self.config.from_name:
                 params["from"] = f"{self.config.from_name} <{self.config.from_email}>"
             
-            response = resend.Emails.send(params)
+            # Older SDKs have no pluggable HTTP client and use their built-in timeout
+            if timeout is not None and hasattr(resend, "RequestsClient"):
+                with _http_client_lock:
+                    previous_client = resend.default_http_client
+                    resend.default_http_client = resend.RequestsClient(timeout=timeout)
+                    try:
+                        response = resend.Emails.send(params)
+                    finally:
+                        resend.default_http_client = previous_client
+            else:
+                response = resend.Emails.send(params)
             
             # Check if email was sent successfully
             # The response is a dictionary with an 'id' key
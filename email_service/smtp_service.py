@@ -0,0 +1,256 @@
+import queue
+import smtplib
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+from typing import List, Optional, Tuple
+from .base import EmailService, EmailConfig, EmailContent
+
+
+@dataclass
+class SMTPConfig:
+    """Connection settings for an SMTP server"""
+    host: str
+    port: int = 587
+    username: Optional[str] = None
+    password: Optional[str] = None
+    starttls: bool = True
+    use_ssl: bool = False
+    pool_size: int = 4
+    timeout: float = 30
+    max_messages_per_connection: int = 100
+    max_idle_seconds: float = 60
+
+
+class _PooledConnection:
+    """An authenticated SMTP connection and its usage counters"""
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPEmailService(EmailService):
+    """
+    SMTP email service with a pool of persistent, authenticated connections
+
+    Each connection is reused for many messages, so the TCP, TLS and AUTH
+    handshakes are paid once per connection rather than once per message.
+    Connections that were dropped by the server are replaced transparently.
+    """
+
+    def __init__(self, config: EmailConfig, smtp_config: SMTPConfig):
+        super().__init__(config)
+        self.smtp_config = smtp_config
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max(1, smtp_config.pool_size))
+
+    def _connect(self, timeout: Optional[float] = None) -> _PooledConnection:
+        """
+        Open and authenticate a new SMTP connection
+
+        Args:
+            timeout: Maximum time in seconds for each step of the handshake
+        """
+        cfg = self.smtp_config
+        if timeout is not None and timeout <= 0:
+            raise TimeoutError("SMTP send deadline exceeded")
+        socket_timeout = cfg.timeout if timeout is None else min(timeout, cfg.timeout)
+        if cfg.use_ssl:
+            smtp = smtplib.SMTP_SSL(cfg.host, cfg.port, timeout=socket_timeout, context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(cfg.host, cfg.port, timeout=socket_timeout)
+        try:
+            smtp.ehlo()
+            if cfg.starttls and not cfg.use_ssl and smtp.has_extn("starttls"):
+                smtp.starttls(context=ssl.create_default_context())
+                smtp.ehlo()
+            if cfg.username:
+                smtp.login(cfg.username, cfg.password or "")
+        except Exception:
+            self._close(smtp)
+            raise
+        if smtp.sock is not None:
+            smtp.sock.settimeout(cfg.timeout)
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    def _close(smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+
+    def _acquire(self, timeout: Optional[float] = None) -> _PooledConnection:
+        """
+        Take an idle connection from the pool, or open one if none is reusable
+
+        Args:
+            timeout: Maximum time in seconds to wait for a free slot and to connect
+
+        Raises:
+            TimeoutError: If no slot became free or the connection could not be opened in time
+        """
+        started = time.monotonic()
+        if timeout is not None and timeout <= 0:
+            raise TimeoutError("SMTP send deadline exceeded")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Timed out waiting for a free SMTP connection")
+        try:
+            while True:
+                try:
+                    connection = self._idle.get_nowait()
+                except queue.Empty:
+                    remaining = None if timeout is None else timeout - (time.monotonic() - started)
+                    return self._connect(remaining)
+
+                # Long idle connections are likely to have been closed by the server
+                if time.monotonic() - connection.last_used > self.smtp_config.max_idle_seconds:
+                    try:
+                        if connection.smtp.noop()[0] == 250:
+                            return connection
+                    except smtplib.SMTPException:
+                        pass
+                    self._close(connection.smtp)
+                    continue
+                return connection
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, connection: Optional[_PooledConnection]):
+        """Return a healthy connection to the pool, recycling worn-out ones"""
+        try:
+            if connection is None:
+                return
+            connection.last_used = time.monotonic()
+            if connection.messages_sent >= self.smtp_config.max_messages_per_connection:
+                self._close(connection.smtp)
+            else:
+                self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    def _build_message(self, to_email: str, content: EmailContent) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = formataddr((self.config.from_name, self.config.from_email)) if self.config.from_name \
+            else self.config.from_email
+        message["To"] = to_email
+        message["Subject"] = content.subject
+        message["Message-ID"] = make_msgid(domain=self.config.from_email.split("@")[-1])
+        message.set_content(content.text_content or "")
+        message.add_alternative(content.html_content, subtype="html")
+        return message
+
+    def send_email(self, to_email: str, content: EmailContent, timeout: Optional[float] = None) -> bool:
+        """
+        Send an email over a pooled SMTP connection
+
+        If the server dropped the connection, the other idle connections are assumed
+        stale too; they are discarded and the message is retried once on a new one.
+
+        Args:
+            to_email: Recipient email address
+            content: Email content including subject and body
+            timeout: Maximum time in seconds to spend on the send, including waiting
+                for a pooled connection and opening a new one
+
+        Returns:
+            bool: True if email sent successfully, False otherwise
+        """
+        try:
+            message = self._build_message(to_email, content)
+            started = time.monotonic()
+            for attempt in range(2):
+                remaining = None if timeout is None else timeout - (time.monotonic() - started)
+                connection = self._acquire(remaining)
+                if timeout is not None:
+                    remaining = timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        self._release(connection)
+                        raise TimeoutError("SMTP send deadline exceeded")
+                try:
+                    if remaining is not None and connection.smtp.sock is not None:
+                        connection.smtp.sock.settimeout(min(remaining, self.smtp_config.timeout))
+                    connection.smtp.send_message(message)
+                    connection.messages_sent += 1
+                    return True
+                except OSError as e:
+                    # SMTPException subclasses OSError; only a dropped connection or a
+                    # socket error means the pool is stale and the message can be resent
+                    if isinstance(e, smtplib.SMTPException) and not isinstance(e, smtplib.SMTPServerDisconnected):
+                        # The server rejected the message (e.g. SMTPRecipientsRefused,
+                        # SMTPDataError); reset the transaction so the connection can be reused
+                        try:
+                            connection.smtp.rset()
+                        except OSError:
+                            self._close(connection.smtp)
+                            connection = None
+                        raise
+                    self._close(connection.smtp)
+                    connection = None
+                    self.close()
+                    if attempt:
+                        raise
+                finally:
+                    if connection is not None and connection.smtp.sock is not None:
+                        connection.smtp.sock.settimeout(self.smtp_config.timeout)
+                    self._release(connection)
+            return False
+
+        except Exception as e:
+            print(f"Error sending email via SMTP: {e}")
+            return False
+
+    def send_bulk(self, messages: List[Tuple[str, EmailContent]], timeout: Optional[float] = None) -> List[bool]:
+        """
+        Send many emails concurrently over the connection pool
+
+        Args:
+            messages: (recipient, content) pairs
+            timeout: Maximum time in seconds to spend on each send
+
+        Returns:
+            list: Send result for each message, in input order
+        """
+        with ThreadPoolExecutor(max_workers=max(1, self.smtp_config.pool_size)) as executor:
+            return list(executor.map(lambda item: self.send_email(*item, timeout=timeout), messages))
+
+    def test_connection(self) -> bool:
+        """
+        Test the connection to the SMTP server by opening a new pooled connection
+
+        Returns:
+            bool: True if the server accepted the connection and credentials, False otherwise
+        """
+        connection = None
+        if not self._slots.acquire(timeout=self.smtp_config.timeout):
+            print("Error testing SMTP connection: timed out waiting for a free connection")
+            return False
+        try:
+            connection = self._connect()
+            connection.smtp.noop()
+            print(f"✅ Connected to SMTP server {self.smtp_config.host}:{self.smtp_config.port}")
+            return True
+        except Exception as e:
+            print(f"Error testing SMTP connection: {e}")
+            return False
+        finally:
+            self._release(connection)
+
+    def close(self):
+        """Close all idle pooled connections"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(connection.smtp)
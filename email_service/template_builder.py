@@ -0,0 +1,446 @@
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from html import escape
+from typing import Any, Dict, List, Optional, Tuple
+from jinja2 import Template
+
+
+# Gmail clips messages larger than ~102 KB, so stay comfortably below that
+DEFAULT_MAX_BYTES = 100_000
+
+DEFAULT_TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), '..', 'templates', 'email_template.html')
+DIGEST_TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), '..', 'templates', 'digest_template.html')
+
+_STYLE_BLOCK_RE = re.compile(r'<style[^>]*>(.*?)</style>', re.DOTALL | re.IGNORECASE)
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_RULE_RE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+_COMPOUND_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9-]*)?((?:\.[a-zA-Z_][\w-]*)*)$')
+_TAG_RE = re.compile(
+    r'<(/?)([a-zA-Z][a-zA-Z0-9]*)'
+    r'((?:\s+[^\s<>=/]+(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s>]+))?)*)'
+    r'\s*(/?)>'
+)
+_ATTR_RE = re.compile(r'([^\s=/]+)(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+))?')
+_HTML_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+_BLOCK_TAGS = (
+    'html|head|body|meta|title|style|div|p|h[1-6]|ul|ol|li|table|thead|tbody|tr|td|th|br|hr'
+)
+_SPACE_BEFORE_BLOCK_RE = re.compile(rf'\s+(</?(?:{_BLOCK_TAGS})\b)', re.IGNORECASE)
+_SPACE_AFTER_BLOCK_RE = re.compile(rf'(</?(?:{_BLOCK_TAGS})\b[^>]*>)\s+', re.IGNORECASE)
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+
+@dataclass
+class _CssRule:
+    """A single selector with its declarations, in source order"""
+    selector: str
+    declarations: str
+    order: int
+    compounds: Optional[List[Tuple[Optional[str], Tuple[str, ...]]]] = None
+
+    @property
+    def specificity(self) -> int:
+        return sum(len(classes) * 10 + (1 if tag else 0) for tag, classes in self.compounds or [])
+
+
+@dataclass
+class CompiledEmailTemplate:
+    """Email template with its stylesheet inlined and whitespace minified"""
+    template: Template
+    source_bytes: int
+    compiled_bytes: int
+
+
+@dataclass
+class EmailSection:
+    """
+    One independently truncatable part of an email, e.g. a digest topic
+
+    `item` is the section's entry in the template context (e.g. for a table of
+    contents); it is only passed to the template if the section is kept.
+    """
+    item: Any
+    opening: str
+    content: str
+    closing: str = '</div>'
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a stylesheet"""
+    css = _CSS_COMMENT_RE.sub('', css)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};:,>])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_html(html: str) -> str:
+    """
+    Collapse whitespace in an HTML fragment
+
+    Whitespace around block-level tags is removed entirely; elsewhere it is
+    collapsed to a single space so inline text keeps its word breaks.
+    """
+    html = _HTML_COMMENT_RE.sub('', html)
+    html = re.sub(r'\s+', ' ', html)
+    html = _SPACE_BEFORE_BLOCK_RE.sub(r'\1', html)
+    html = _SPACE_AFTER_BLOCK_RE.sub(r'\1', html)
+    return html.strip()
+
+
+def _parse_css(css: str) -> List[_CssRule]:
+    """Parse a flat stylesheet into one rule per selector"""
+    rules = []
+    for selectors, body in _CSS_RULE_RE.findall(minify_css(css)):
+        declarations = body.strip().rstrip(';')
+        for selector in selectors.split(','):
+            selector = selector.strip()
+            rule = _CssRule(selector=selector, declarations=declarations, order=len(rules))
+            compounds = []
+            for part in selector.split():
+                match = _COMPOUND_RE.match(part)
+                if not match or not part:
+                    compounds = None
+                    break
+                tag, classes = match.groups()
+                compounds.append((tag.lower() if tag else None, tuple(c for c in classes.split('.') if c)))
+            rule.compounds = compounds
+            rules.append(rule)
+    return rules
+
+
+def _get_attr(attrs: str, name: str) -> Optional[str]:
+    for attr_name, value in _ATTR_RE.findall(attrs):
+        if attr_name.lower() == name:
+            return value[1:-1] if value[:1] in ('"', "'") else value
+    return None
+
+
+def _set_attr(attrs: str, name: str, value: Optional[str]) -> str:
+    """Replace, add or (when value is None) remove an attribute"""
+    pattern = re.compile(rf'\s+{name}(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s>]+))?', re.IGNORECASE)
+    attrs = pattern.sub('', attrs)
+    if value is None:
+        return attrs
+    return f'{attrs} {name}="{value.replace(chr(34), chr(39))}"'
+
+
+def _compound_matches(compound, tag: str, classes: set) -> bool:
+    compound_tag, compound_classes = compound
+    if compound_tag and compound_tag != tag:
+        return False
+    return all(c in classes for c in compound_classes)
+
+
+def _selector_matches(compounds, tag: str, classes: set, ancestors: List[Tuple[str, set]]) -> bool:
+    if not _compound_matches(compounds[-1], tag, classes):
+        return False
+    remaining = compounds[:-1]
+    for ancestor_tag, ancestor_classes in reversed(ancestors):
+        if not remaining:
+            break
+        if _compound_matches(remaining[-1], ancestor_tag, ancestor_classes):
+            remaining = remaining[:-1]
+    return not remaining
+
+
+def _merge_declarations(*blocks: str) -> str:
+    """Merge declaration blocks, later properties overriding earlier ones"""
+    merged: Dict[str, str] = {}
+    for block in blocks:
+        for declaration in block.split(';'):
+            if ':' not in declaration:
+                continue
+            prop, value = declaration.split(':', 1)
+            prop = prop.strip().lower()
+            merged.pop(prop, None)
+            merged[prop] = value.strip()
+    return ';'.join(f'{prop}:{value}' for prop, value in merged.items())
+
+
+def inline_css(html: str, rules: List[_CssRule]) -> Tuple[str, List[_CssRule]]:
+    """
+    Inline stylesheet rules into the matching elements' style attributes
+
+    Args:
+        html: HTML markup (without its <style> block)
+        rules: Parsed stylesheet rules
+
+    Returns:
+        Tuple of the inlined HTML and the rules that could not be inlined,
+        either because they use unsupported selectors (pseudo-classes, ids,
+        child combinators) or because they only target content inserted at
+        render time
+    """
+    inlinable = [rule for rule in rules if rule.compounds]
+    used = set()
+    ancestors: List[Tuple[str, set]] = []
+
+    def replace_tag(match):
+        closing, tag, attrs, self_closing = match.groups()
+        tag = tag.lower()
+        if closing:
+            for i in range(len(ancestors) - 1, -1, -1):
+                if ancestors[i][0] == tag:
+                    del ancestors[i:]
+                    break
+            return match.group(0)
+
+        classes = set((_get_attr(attrs, 'class') or '').split())
+        matched = [rule for rule in inlinable if _selector_matches(rule.compounds, tag, classes, ancestors)]
+        if tag not in _VOID_TAGS and not self_closing:
+            ancestors.append((tag, classes))
+        if not matched:
+            return match.group(0)
+
+        matched.sort(key=lambda rule: (rule.specificity, rule.order))
+        used.update(rule.order for rule in matched)
+        style = _merge_declarations(*(rule.declarations for rule in matched), _get_attr(attrs, 'style') or '')
+        return f'<{tag}{_set_attr(attrs, "style", style)}{self_closing}>'
+
+    inlined = _TAG_RE.sub(replace_tag, html)
+    leftover = [rule for rule in rules if rule.order not in used]
+    return inlined, leftover
+
+
+def dedupe_inline_styles(html: str, min_count: int = 2, prefix: str = 's') -> Tuple[str, str]:
+    """
+    Replace repeated inline style attributes with generated classes
+
+    Args:
+        html: HTML fragment
+        min_count: Minimum occurrences before a style is moved into a class
+        prefix: Prefix for the generated class names
+
+    Returns:
+        Tuple of the rewritten HTML and the stylesheet for the generated classes
+    """
+    counts: Dict[str, int] = {}
+    for match in _TAG_RE.finditer(html):
+        style = _get_attr(match.group(3), 'style')
+        if style and not match.group(1):
+            counts[style] = counts.get(style, 0) + 1
+
+    class_names = {}
+    for style, count in counts.items():
+        name = f'{prefix}{len(class_names)}'
+        # Only worth it when the repeated attribute outweighs the new CSS rule
+        if count >= min_count and count * len(style) > len(style) + len(name) * count + 4:
+            class_names[style] = name
+    if not class_names:
+        return html, ''
+
+    def replace_tag(match):
+        closing, tag, attrs, self_closing = match.groups()
+        style = _get_attr(attrs, 'style')
+        if closing or style not in class_names:
+            return match.group(0)
+        classes = (_get_attr(attrs, 'class') or '').split() + [class_names[style]]
+        attrs = _set_attr(_set_attr(attrs, 'style', None), 'class', ' '.join(classes))
+        return f'<{tag}{attrs}{self_closing}>'
+
+    css = ''.join(f'.{name}{{{_merge_declarations(style)}}}' for style, name in class_names.items())
+    return _TAG_RE.sub(replace_tag, html), css
+
+
+def _prefix_within(blocks: List[str], max_bytes: int) -> List[str]:
+    """Longest prefix of blocks whose combined size fits in max_bytes"""
+    size = 0
+    for i, block in enumerate(blocks):
+        size += len(block.encode('utf-8'))
+        if size > max_bytes:
+            return blocks[:i]
+    return blocks
+
+
+def split_blocks(html: str) -> List[str]:
+    """Split an HTML fragment into its top-level elements"""
+    blocks = []
+    depth = 0
+    start = 0
+    for match in _TAG_RE.finditer(html):
+        closing, tag, _, self_closing = match.groups()
+        if tag.lower() in _VOID_TAGS or self_closing:
+            if depth == 0:
+                blocks.append(html[start:match.end()])
+                start = match.end()
+            continue
+        depth += -1 if closing else 1
+        if depth <= 0:
+            depth = 0
+            blocks.append(html[start:match.end()])
+            start = match.end()
+    tail = html[start:]
+    if tail.strip():
+        blocks.append(tail)
+    return [block.strip() for block in blocks if block.strip()]
+
+
+@lru_cache(maxsize=8)
+def _compile_cached(template_path: str, mtime: float) -> CompiledEmailTemplate:
+    with open(template_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+
+    rules = []
+    for css in _STYLE_BLOCK_RE.findall(source):
+        rules.extend(_parse_css(css))
+    body = _STYLE_BLOCK_RE.sub('', source)
+    body, leftover = inline_css(body, rules)
+
+    # Rules for render-time content and pseudo-classes stay in <head>, followed
+    # by the classes generated per render when deduplicating inline styles
+    leftover_css = ''.join(f'{rule.selector}{{{rule.declarations}}}' for rule in leftover)
+    style_block = '<style>{% raw %}' + leftover_css + '{% endraw %}{{ extra_css|safe }}</style>'
+    body = re.sub(r'</head>', lambda _: style_block + '</head>', body, count=1, flags=re.IGNORECASE)
+    compiled = minify_html(body)
+
+    return CompiledEmailTemplate(
+        template=Template(compiled),
+        source_bytes=len(source.encode('utf-8')),
+        compiled_bytes=len(compiled.encode('utf-8')),
+    )
+
+
+def compile_template(template_path: str = DEFAULT_TEMPLATE_PATH) -> CompiledEmailTemplate:
+    """
+    Compile an email template, inlining its CSS and minifying the markup
+
+    Compilation is cached per file and only repeated when the file changes.
+
+    Args:
+        template_path: Path to the Jinja2 HTML template
+
+    Returns:
+        CompiledEmailTemplate: The compiled template
+    """
+    template_path = os.path.abspath(template_path)
+    return _compile_cached(template_path, os.path.getmtime(template_path))
+
+
+class EmailTemplateBuilder:
+    """Renders compiled email templates within a byte budget"""
+
+    def __init__(
+        self,
+        template_path: str = DEFAULT_TEMPLATE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        archive_url: Optional[str] = None,
+        dedupe_styles: bool = True,
+    ):
+        self.template_path = template_path
+        self.max_bytes = max_bytes
+        self.archive_url = archive_url
+        self.dedupe_styles = dedupe_styles
+
+    def _render_blocks(self, compiled: CompiledEmailTemplate, blocks: List[str], context: dict) -> str:
+        content = ''.join(blocks)
+        extra_css = ''
+        if self.dedupe_styles:
+            content, extra_css = dedupe_inline_styles(content)
+        return compiled.template.render(content=content, extra_css=extra_css, **context)
+
+    def _read_more_block(self, archive_url: str) -> str:
+        return (
+            '<p style="margin-top:20px;font-weight:600">This report was shortened to fit your inbox. '
+            f'<a href="{escape(archive_url)}" style="color:#007bff;text-decoration:none">Read the full report</a></p>'
+        )
+
+    def exceeds_budget(self, html: str) -> bool:
+        """Whether a rendered email is larger than the byte budget"""
+        return bool(self.max_bytes) and len(html.encode('utf-8')) > self.max_bytes
+
+    def render(self, content: str, archive_url: Optional[str] = None, **context) -> str:
+        """
+        Render the email, truncating the content if it exceeds the byte budget
+
+        Content is only truncated when there is an archived copy to link to;
+        without one the full email is returned.
+
+        Args:
+            content: HTML formatted report content
+            archive_url: Link to the full archived report, used in the "read more" notice
+            **context: Remaining template variables (topic, date, subject)
+
+        Returns:
+            str: Rendered and minified HTML email
+        """
+        compiled = compile_template(self.template_path)
+        blocks = split_blocks(minify_html(content))
+        html = self._render_blocks(compiled, blocks, context)
+        archive_url = archive_url or self.archive_url
+        if not archive_url or not self.exceeds_budget(html):
+            return html
+
+        # Binary search for the longest prefix of blocks that fits with the notice
+        read_more = self._read_more_block(archive_url)
+        low, high = 0, len(blocks) - 1
+        best = self._render_blocks(compiled, [read_more], context)
+        while low <= high:
+            mid = (low + high) // 2
+            candidate = self._render_blocks(compiled, blocks[:mid] + [read_more], context)
+            if len(candidate.encode('utf-8')) <= self.max_bytes:
+                best = candidate
+                low = mid + 1
+            else:
+                high = mid - 1
+        return best
+
+    def render_sections(self, sections: List[EmailSection], archive_url: Optional[str] = None,
+                        items_key: str = 'sections', **context) -> str:
+        """
+        Render an email made of sections, sharing the byte budget between them
+
+        If the email is too large, every section's content is capped at the same
+        size, with the cap as large as the budget allows: small sections are kept
+        whole and only oversized ones are cut, each ending with the "read more"
+        notice. Trailing sections are dropped only if even their headings do not fit.
+        As with `render()`, nothing is truncated without an archived copy to link to.
+
+        Args:
+            sections: Sections in display order
+            archive_url: Link to the full archived email, used in the "read more" notice
+            items_key: Template variable receiving the items of the kept sections
+            **context: Remaining template variables
+
+        Returns:
+            str: Rendered and minified HTML email
+        """
+        compiled = compile_template(self.template_path)
+        section_blocks = [split_blocks(minify_html(section.content)) for section in sections]
+        archive_url = archive_url or self.archive_url
+        read_more = self._read_more_block(archive_url) if archive_url else ''
+
+        def build(count: int, cap: Optional[int] = None) -> str:
+            parts = []
+            for section, blocks in zip(sections[:count], section_blocks):
+                kept = blocks if cap is None else _prefix_within(blocks, cap)
+                notice = read_more if len(kept) < len(blocks) else ''
+                parts.append(section.opening + ''.join(kept) + notice + section.closing)
+            items = [section.item for section in sections[:count]]
+            return self._render_blocks(compiled, parts, {**context, items_key: items})
+
+        def fits(html: str) -> bool:
+            return not self.exceeds_budget(html)
+
+        html = build(len(sections))
+        if not archive_url or fits(html):
+            return html
+
+        largest = max(sum(len(block.encode('utf-8')) for block in blocks) for blocks in section_blocks)
+        for count in range(len(sections), 0, -1):
+            best = build(count, 0)
+            if not fits(best):
+                continue
+            # Binary search for the largest per-section cap that fits
+            low, high = 1, largest
+            while low <= high:
+                mid = (low + high) // 2
+                candidate = build(count, mid)
+                if fits(candidate):
+                    best = candidate
+                    low = mid + 1
+                else:
+                    high = mid - 1
+            return best
+        return self._render_blocks(compiled, [read_more], {**context, items_key: []})
@@ -0,0 +1 @@
+# News search package 
\ No newline at end of file
@@ -0,0 +1,57 @@
+import json
+from typing import List, Optional
+from google.genai import types
+from pipeline.deadline import Deadline
+from prompts import newsletter as prompts
+from prompts.usage import TokenUsage
+
+
+# Cheap model used to suggest related search terms
+EXPANSION_MODEL = "gemini-2.5-flash-lite"
+
+# Upper bound for the expansion request; the search still works without it
+EXPANSION_TIMEOUT = 15
+
+MAX_RELATED_TERMS = 4
+
+
+def suggest_related_terms(client, topic: str, deadline: Optional[Deadline] = None,
+                          usage: Optional[TokenUsage] = None) -> List[str]:
+    """
+    Ask a fast model for synonyms and closely related terms of a topic
+
+    The terms only widen the search, so any failure returns no terms rather
+    than failing the run.
+
+    Args:
+        client: google.genai client
+        topic: Topic as entered by the user
+        deadline: Run deadline bounding the request
+        usage: Token usage accumulator to record the call in
+
+    Returns:
+        list: Related search terms
+    """
+    try:
+        timeout = (deadline or Deadline()).timeout(cap=EXPANSION_TIMEOUT, action="expand the topic")
+        response = client.models.generate_content(
+            model=EXPANSION_MODEL,
+            config=types.GenerateContentConfig(
+                system_instruction=prompts.QUERY_EXPANSION.text,
+                response_mime_type="application/json",
+                response_json_schema={"type": "array", "items": {"type": "string"}},
+                # HttpOptions.timeout is in milliseconds
+                http_options=types.HttpOptions(timeout=int(timeout * 1000))
+            ),
+            contents=topic
+        )
+        if usage is not None:
+            usage.add_gemini(response)
+        terms = json.loads(response.text)
+    except Exception as e:
+        print(f"⚠️  Topic expansion unavailable, searching without related terms: {e}")
+        return []
+
+    if not isinstance(terms, list):
+        return []
+    return [term.strip() for term in terms if isinstance(term, str) and term.strip()][:MAX_RELATED_TERMS]
@@ -0,0 +1,93 @@
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+from pipeline.deadline import Deadline, DeadlineExceeded
+
+
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+
+# Upper bound for a single News API request
+REQUEST_TIMEOUT = 30
+
+
+def fetch_articles(session: requests.Session, api_key: str, query: str, from_date: str, page_size: int = 100,
+                   deadline: Optional[Deadline] = None) -> List[Dict]:
+    """
+    Fetch articles for a single News API query
+
+    Args:
+        session: Shared HTTP session
+        api_key: News API key
+        query: Value of the q parameter
+        from_date: Oldest article date (YYYY-MM-DD)
+        page_size: Number of articles to request (max 100)
+        deadline: Run deadline bounding the request
+
+    Returns:
+        list: Article dicts
+    """
+    response = session.get(
+        NEWS_API_URL,
+        params={
+            "q": query,
+            "from": from_date,
+            "sortBy": "relevancy",
+            "pageSize": page_size,
+            "apiKey": api_key,
+        },
+        timeout=(deadline or Deadline()).timeout(cap=REQUEST_TIMEOUT, action="query the News API"),
+    )
+    response.raise_for_status()
+    return response.json().get("articles", [])
+
+
+def fetch_all(api_key: str, queries: List[str], from_date: str, page_size: int = 100,
+              deadline: Optional[Deadline] = None) -> List[Dict]:
+    """
+    Fetch several queries in parallel and merge the results
+
+    Articles are deduplicated by URL, falling back to the normalised title. A query
+    that fails or does not finish before the deadline is reported and skipped so the
+    others can still be used.
+
+    Args:
+        api_key: News API key
+        queries: Sub-queries from the query planner
+        from_date: Oldest article date (YYYY-MM-DD)
+        page_size: Number of articles to request per query
+        deadline: Run deadline bounding all requests
+
+    Returns:
+        list: Unique articles in query order
+    """
+    if not queries:
+        return []
+    deadline = deadline or Deadline()
+
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        futures = [
+            executor.submit(fetch_articles, session, api_key, query, from_date, page_size, deadline)
+            for query in queries
+        ]
+        wait(futures, timeout=deadline.wait_timeout())
+        results = []
+        for query, future in zip(queries, futures):
+            if not future.done():
+                future.cancel()
+                print(f"⚠️  News API query {query!r} did not finish before the deadline")
+                continue
+            try:
+                results.append(future.result())
+            except (requests.RequestException, DeadlineExceeded) as e:
+                print(f"⚠️  News API query {query!r} failed: {e}")
+
+    seen = set()
+    merged = []
+    for articles in results:
+        for article in articles:
+            key = article.get("url") or " ".join((article.get("title") or "").lower().split())
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            merged.append(article)
+    return merged
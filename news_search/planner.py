@@ -0,0 +1,191 @@
+import re
+from typing import List, Optional
+
+
+# Words that carry no meaning on their own in a News API query
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it",
+    "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "with", "latest", "news",
+}
+
+# News API limits the q parameter to 500 characters
+MAX_QUERY_LENGTH = 500
+
+# Common abbreviations, expansions and tickers in news coverage; each group is
+# a set of interchangeable forms, matched as whole words in either direction
+ALIAS_GROUPS = [
+    ["ai", "artificial intelligence"],
+    ["ml", "machine learning"],
+    ["llm", "large language model"],
+    ["llms", "large language models"],
+    ["genai", "generative ai"],
+    ["ev", "electric vehicle"],
+    ["evs", "electric vehicles"],
+    ["crypto", "cryptocurrency"],
+    ["btc", "bitcoin"],
+    ["eth", "ethereum"],
+    ["fed", "federal reserve"],
+    ["ecb", "european central bank"],
+    ["eu", "european union"],
+    ["uk", "united kingdom"],
+    ["us", "united states"],
+    ["ipo", "initial public offering"],
+    ["m&a", "mergers and acquisitions"],
+    ["nvidia", "nvda"],
+    ["tesla", "tsla"],
+    ["apple", "aapl"],
+    ["microsoft", "msft"],
+    ["google", "alphabet", "googl"],
+    ["meta", "facebook"],
+    ["amazon", "amzn"],
+]
+
+
+def _quote(term: str) -> str:
+    return f'"{term}"' if " " in term else term
+
+
+def extract_keywords(text: str) -> List[str]:
+    """
+    Extract the meaningful words of a topic, in order and without duplicates
+
+    Args:
+        text: Topic text
+
+    Returns:
+        list: Lowercased keywords
+    """
+    keywords = []
+    for word in re.findall(r"[\w][\w.+#&-]*", text.lower()):
+        if word not in STOPWORDS and word not in keywords:
+            keywords.append(word)
+    return keywords
+
+
+def extract_entities(text: str) -> List[str]:
+    """
+    Extract likely named entities: acronyms and runs of capitalised words
+
+    Args:
+        text: Topic text
+
+    Returns:
+        list: Entities as written in the topic
+    """
+    entities = []
+    for match in re.finditer(r"\b(?:[A-Z][\w.+-]*)(?:\s+[A-Z][\w.+-]*)*", text):
+        entity = match.group(0).strip()
+        # Very short acronyms ("AI", "EU") match far too broadly on their own
+        if len(entity) >= 3 and entity.lower() not in STOPWORDS and entity not in entities:
+            entities.append(entity)
+    return entities
+
+
+def split_aliases(topic: str) -> List[str]:
+    """
+    Split a topic into the aliases listed by the user, separated by commas or semicolons
+
+    Args:
+        topic: Topic as entered by the user
+
+    Returns:
+        list: The primary topic followed by any manual aliases
+    """
+    return [alias.strip() for alias in re.split(r"[,;]", topic) if alias.strip()]
+
+
+def expand_aliases(topic: str) -> List[str]:
+    """
+    Generate alternative forms of a topic from the built-in alias groups
+
+    Every known term in the topic is replaced by each of its other forms, e.g.
+    "ai agents" gives "artificial intelligence agents" and "nvidia earnings"
+    gives "nvda earnings".
+
+    Args:
+        topic: Topic text
+
+    Returns:
+        list: Alternative forms, without the topic itself
+    """
+    aliases = []
+    for group in ALIAS_GROUPS:
+        for term in group:
+            pattern = re.compile(rf"(?<![\w&]){re.escape(term)}(?![\w&])", re.IGNORECASE)
+            if not pattern.search(topic):
+                continue
+            for other in group:
+                if other == term:
+                    continue
+                alias = pattern.sub(lambda _: other, topic)
+                if alias.lower() != topic.lower() and alias.lower() not in (a.lower() for a in aliases):
+                    aliases.append(alias)
+            break
+    return aliases
+
+
+def plan_aliases(topic: str, related: Optional[List[str]] = None) -> List[str]:
+    """
+    Collect the aliases a topic is searched under
+
+    Aliases the user lists after the topic, separated by commas or semicolons,
+    are used as they are. Otherwise the topic is followed by its alternative forms
+    from the built-in alias groups and then by the `related` terms.
+
+    Args:
+        topic: Topic as entered by the user
+        related: Related terms for the topic (e.g. suggested by a model)
+
+    Returns:
+        list: Distinct aliases, the first one being the primary topic
+    """
+    aliases = split_aliases(topic)
+    if len(aliases) == 1:
+        for alias in expand_aliases(aliases[0]) + list(related or []):
+            alias = alias.strip()
+            if alias and alias.lower() not in (a.lower() for a in aliases):
+                aliases.append(alias)
+    return aliases
+
+
+def plan_queries(topic: str, max_queries: int = 6, related: Optional[List[str]] = None) -> List[str]:
+    """
+    Expand a topic into several News API sub-queries
+
+    Aliases are generated automatically: alternative forms from the built-in alias
+    groups, followed by `related` terms (e.g. suggested by a model). Aliases the user
+    lists after the topic, separated by commas or semicolons (e.g. "AI agents, agentic
+    AI, autonomous agents"), override the automatic ones. The plan contains, in
+    priority order: the exact phrase of each alias, an OR query across all aliases,
+    an AND query over the primary topic's keywords, and one query per named entity.
+
+    Args:
+        topic: Topic as entered by the user
+        max_queries: Maximum number of sub-queries to return
+        related: Related terms for the topic, used when the user listed no aliases
+
+    Returns:
+        list: Distinct sub-queries, the first one always being the primary topic
+    """
+    aliases = plan_aliases(topic, related)
+    if not aliases:
+        return []
+    primary = aliases[0]
+
+    queries = [_quote(alias) for alias in aliases]
+    if len(aliases) > 1:
+        queries.append(" OR ".join(_quote(alias) for alias in aliases))
+
+    keywords = extract_keywords(primary)
+    if len(keywords) > 1:
+        queries.append(" AND ".join(keywords))
+
+    for entity in extract_entities(" ; ".join(aliases)):
+        queries.append(_quote(entity))
+
+    plan = []
+    for query in queries:
+        query = query[:MAX_QUERY_LENGTH]
+        if query.lower() not in (planned.lower() for planned in plan):
+            plan.append(query)
+    return plan[:max_queries]
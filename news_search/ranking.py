@@ -0,0 +1,81 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+from .planner import STOPWORDS
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords"""
+    return [token for token in re.findall(r"\w+", (text or "").lower()) if token not in STOPWORDS]
+
+
+def article_text(article: Dict) -> str:
+    """Text used to score an article; the title is counted twice to weight it"""
+    title = article.get("title") or ""
+    return " ".join([title, title, article.get("description") or "", article.get("content") or ""])
+
+
+def bm25_scores(query: str, documents: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """
+    Score documents against a query with Okapi BM25
+
+    Term and document frequencies are computed once for the whole batch, so
+    scoring is a single pass over the documents.
+
+    Args:
+        query: Query text
+        documents: Document texts
+        k1: Term frequency saturation
+        b: Length normalisation
+
+    Returns:
+        list: One score per document, in input order
+    """
+    query_terms = set(tokenize(query))
+    if not documents or not query_terms:
+        return [0.0] * len(documents)
+
+    term_counts = [Counter(tokenize(document)) for document in documents]
+    lengths = [sum(counts.values()) for counts in term_counts]
+    average_length = (sum(lengths) / len(lengths)) or 1.0
+
+    document_frequency = Counter()
+    for counts in term_counts:
+        document_frequency.update(query_terms & counts.keys())
+    total = len(documents)
+    idf = {
+        term: math.log(1 + (total - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+        for term in query_terms
+    }
+
+    scores = []
+    for counts, length in zip(term_counts, lengths):
+        norm = k1 * (1 - b + b * length / average_length)
+        score = 0.0
+        for term in query_terms & counts.keys():
+            frequency = counts[term]
+            score += idf[term] * frequency * (k1 + 1) / (frequency + norm)
+        scores.append(score)
+    return scores
+
+
+def rank_articles(query: str, articles: List[Dict], top_k: int = 20) -> List[Dict]:
+    """
+    Rank articles by BM25 relevance to the query and keep the top k
+
+    Articles that share no term with the query are kept after the scored ones
+    when there are fewer than k of those: they were still returned by one of the
+    planned searches, which may match on forms the query does not contain.
+
+    Args:
+        query: Query text, typically the topic with its aliases
+        articles: News API article dicts
+        top_k: Number of articles to keep
+
+    Returns:
+        list: The top k articles, most relevant first
+    """
+    scores = bm25_scores(query, [article_text(article) for article in articles])
+    ranked = sorted(zip(scores, range(len(articles))), key=lambda pair: (-pair[0], pair[1]))
+    return [articles[index] for _, index in ranked[:top_k]]
@@ -0,0 +1 @@
+# Pipeline package 
\ No newline at end of file
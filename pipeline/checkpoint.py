@@ -0,0 +1,162 @@
+import json
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from .deadline import Deadline
+
+
+RUN_METADATA_FILE = "run.json"
+
+
+class StageError(Exception):
+    """Raised when a pipeline stage fails; earlier stages stay checkpointed"""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+def atomic_write_text(path: str, text: str):
+    """
+    Write a file atomically
+
+    The text is written to a temporary file in the same directory, flushed to
+    disk and then renamed over the target, so a crash never leaves a partial file.
+
+    Args:
+        path: Destination file path
+        text: Content to write
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Persist the rename itself
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+class RunCheckpoint:
+    """On-disk checkpoint directory holding the outputs of one pipeline run"""
+
+    def __init__(self, run_id: str, root: str = "runs"):
+        self.run_id = run_id
+        self.directory = os.path.join(root, run_id)
+
+    @classmethod
+    def create(cls, root: str = "runs", **metadata) -> "RunCheckpoint":
+        """
+        Create a new run directory and record its metadata
+
+        Args:
+            root: Checkpoint root directory
+            **metadata: Run inputs needed to resume it (topic, dates, ...)
+
+        Returns:
+            RunCheckpoint: The new checkpoint
+        """
+        run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        checkpoint = cls(run_id, root)
+        os.makedirs(checkpoint.directory, exist_ok=True)
+        checkpoint.write_json(RUN_METADATA_FILE, {"run_id": run_id, "created_at": datetime.now().isoformat(), **metadata})
+        return checkpoint
+
+    @classmethod
+    def load(cls, run_id: str, root: str = "runs") -> "RunCheckpoint":
+        """
+        Open an existing run directory
+
+        Raises:
+            FileNotFoundError: If the run does not exist
+        """
+        checkpoint = cls(run_id, root)
+        if not checkpoint.has(RUN_METADATA_FILE):
+            raise FileNotFoundError(f"No checkpoint found for run '{run_id}' in {root}")
+        return checkpoint
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.read_json(RUN_METADATA_FILE)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def has(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    def read_text(self, name: str) -> str:
+        with open(self.path(name), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def write_text(self, name: str, text: str):
+        atomic_write_text(self.path(name), text)
+
+    def read_json(self, name: str) -> Any:
+        return json.loads(self.read_text(name))
+
+    def write_json(self, name: str, data: Any):
+        self.write_text(name, json.dumps(data, indent=2, ensure_ascii=False))
+
+
+@dataclass
+class Stage:
+    """
+    A pipeline stage whose output is checkpointed to a single file
+
+    `run` receives the outputs of the previous stages keyed by stage name and
+    returns this stage's output as text. Returning None marks the stage as
+    skipped; nothing is written and it runs again on resume.
+    """
+    name: str
+    filename: str
+    run: Callable[[Dict[str, str]], Optional[str]]
+
+
+def run_stages(checkpoint: RunCheckpoint, stages: List[Stage], deadline: Optional[Deadline] = None) -> Dict[str, str]:
+    """
+    Run stages in order, skipping any whose output is already checkpointed
+
+    Args:
+        checkpoint: Checkpoint directory for this run
+        stages: Stages to run
+        deadline: Run deadline, checked before each stage starts
+
+    Returns:
+        dict: Output of each completed stage keyed by stage name
+    """
+    outputs: Dict[str, str] = {}
+    for stage in stages:
+        if checkpoint.has(stage.filename):
+            print(f"⏭️  {stage.name}: reusing {checkpoint.path(stage.filename)}")
+            outputs[stage.name] = checkpoint.read_text(stage.filename)
+            continue
+
+        try:
+            if deadline is not None:
+                deadline.check(f"start stage '{stage.name}'")
+            output = stage.run(outputs)
+        except Exception as e:
+            raise StageError(stage.name, e) from e
+        if output is None:
+            continue
+        checkpoint.write_text(stage.filename, output)
+        outputs[stage.name] = output
+    return outputs
@@ -0,0 +1,109 @@
+import math
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a run's deadline has passed"""
+    pass
+
+
+class Deadline:
+    """
+    Wall-clock budget for one run, shared by every stage and client call
+
+    Blocking calls take their timeout from the time remaining, so no single call
+    can outlive the run. Long running loops call `check()` between units of work
+    to stop cooperatively once the deadline has passed.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Args:
+            seconds: Budget in seconds from now; None or <= 0 means no deadline
+        """
+        self.seconds = seconds if seconds and seconds > 0 else None
+        self.expires_at = time.monotonic() + self.seconds if self.seconds else math.inf
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (infinite when there is none)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def wait_timeout(self) -> Optional[float]:
+        """Remaining time as a wait timeout, where None means wait indefinitely"""
+        return None if self.seconds is None else self.remaining()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, action: str = "continue"):
+        """
+        Raise if the deadline has passed
+
+        Args:
+            action: What was about to happen, for the error message
+
+        Raises:
+            DeadlineExceeded: If no time is left
+        """
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline of {self.seconds:.0f}s exceeded; cannot {action}")
+
+    def timeout(self, cap: Optional[float] = None, action: str = "start a request") -> Optional[float]:
+        """
+        Turn the remaining time into a per-request timeout
+
+        Args:
+            cap: Upper bound for the timeout, e.g. the usual timeout for this call
+            action: What the timeout is for, for the error message
+
+        Returns:
+            Timeout in seconds, or `cap` (possibly None) when there is no deadline
+
+        Raises:
+            DeadlineExceeded: If no time is left
+        """
+        self.check(action)
+        remaining = self.remaining()
+        if math.isinf(remaining):
+            return cap
+        return min(remaining, cap) if cap else remaining
+
+
+class wait_within_deadline:
+    """
+    tenacity wait strategy that never sleeps past the deadline
+
+    The deadline is read from the `deadline` keyword argument of the retried call.
+    """
+
+    def __init__(self, base_wait, min_attempt_seconds: float = 5):
+        self.base_wait = base_wait
+        self.min_attempt_seconds = min_attempt_seconds
+
+    def __call__(self, retry_state) -> float:
+        sleep = self.base_wait(retry_state)
+        deadline = retry_state.kwargs.get("deadline")
+        if deadline is None:
+            return sleep
+        return max(0.0, min(sleep, deadline.remaining() - self.min_attempt_seconds))
+
+
+class stop_at_deadline:
+    """
+    tenacity stop condition: give up when another attempt could not finish in time
+
+    The deadline is read from the `deadline` keyword argument of the retried call.
+    """
+
+    def __init__(self, min_attempt_seconds: float = 5):
+        self.min_attempt_seconds = min_attempt_seconds
+
+    def __call__(self, retry_state) -> bool:
+        deadline = retry_state.kwargs.get("deadline")
+        if deadline is None:
+            return False
+        if retry_state.outcome is not None and isinstance(retry_state.outcome.exception(), DeadlineExceeded):
+            return True
+        upcoming_sleep = getattr(retry_state, "upcoming_sleep", 0) or 0
+        return deadline.remaining() - upcoming_sleep < self.min_attempt_seconds
@@ -0,0 +1,79 @@
+from typing import Optional
+from google.genai import types
+from pipeline.deadline import Deadline
+from .newsletter import PromptPrefix
+
+
+# Smallest prompt Gemini accepts for explicit context caching, per model family
+MIN_CACHE_TOKENS = {
+    "gemini-2.5-flash": 1024,
+    "gemini-2.5-pro": 2048,
+}
+DEFAULT_MIN_CACHE_TOKENS = 4096
+
+# Upper bound for a single cache lookup or creation request
+CACHE_REQUEST_TIMEOUT = 10
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token), good enough to compare against the cache minimum"""
+    return len(text) // 4
+
+
+def min_cache_tokens(model: str) -> int:
+    """Minimum cacheable prompt size for a model"""
+    for family, tokens in MIN_CACHE_TOKENS.items():
+        if model.startswith(family):
+            return tokens
+    return DEFAULT_MIN_CACHE_TOKENS
+
+
+def get_gemini_cache(client, model: str, prefix: PromptPrefix, ttl_seconds: int = 3600,
+                     deadline: Optional[Deadline] = None) -> Optional[str]:
+    """
+    Get or create a Gemini context cache holding a prompt prefix
+
+    Caches are looked up by the prefix's cache key, so repeated runs within the
+    TTL reuse the same cache instead of sending the instructions again. Gemini
+    only caches prompts above a minimum size; shorter prefixes are not sent to
+    the cache API at all and the caller should send the prefix inline, which
+    still benefits from Gemini's implicit prefix caching.
+
+    Args:
+        client: google.genai client
+        model: Model the cache is used with
+        prefix: Prompt prefix to cache as the system instruction
+        ttl_seconds: Cache lifetime
+        deadline: Run deadline bounding the cache requests
+
+    Returns:
+        Cache name to pass as `cached_content`, or None if the prefix cannot be cached
+    """
+    if estimate_tokens(prefix.text) < min_cache_tokens(model):
+        return None
+
+    deadline = deadline or Deadline()
+    try:
+        def http_options() -> types.HttpOptions:
+            # HttpOptions.timeout is in milliseconds
+            timeout = deadline.timeout(cap=CACHE_REQUEST_TIMEOUT, action="look up the Gemini context cache")
+            return types.HttpOptions(timeout=int(timeout * 1000))
+
+        caches = client.caches.list(config=types.ListCachedContentsConfig(http_options=http_options()))
+        for cache in caches:
+            if cache.display_name == prefix.cache_key and (cache.model or "").endswith(model):
+                return cache.name
+
+        cache = client.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                display_name=prefix.cache_key,
+                system_instruction=prefix.text,
+                ttl=f"{ttl_seconds}s",
+                http_options=http_options(),
+            ),
+        )
+        return cache.name
+    except Exception as e:
+        print(f"💾 Gemini context cache unavailable, sending instructions inline: {e}")
+        return None
@@ -0,0 +1,60 @@
+from dataclasses import dataclass, asdict
+from typing import Any
+
+
+def _get(obj: Any, name: str, default=None):
+    """Read a field from an SDK object or its serialized dict"""
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+@dataclass
+class TokenUsage:
+    """Input, cached and output token counts accumulated over a run's model calls"""
+    calls: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+
+    def add_openai(self, response: Any) -> "TokenUsage":
+        """Record the usage of an OpenAI Responses API response (object or dict)"""
+        usage = _get(response, "usage")
+        if usage is not None:
+            self.calls += 1
+            self.input_tokens += _get(usage, "input_tokens", 0) or 0
+            self.cached_tokens += _get(_get(usage, "input_tokens_details"), "cached_tokens", 0) or 0
+            self.output_tokens += _get(usage, "output_tokens", 0) or 0
+        return self
+
+    def add_gemini(self, response: Any) -> "TokenUsage":
+        """Record the usage of a Gemini generate_content response"""
+        usage = _get(response, "usage_metadata")
+        if usage is not None:
+            self.calls += 1
+            self.input_tokens += _get(usage, "prompt_token_count", 0) or 0
+            self.cached_tokens += _get(usage, "cached_content_token_count", 0) or 0
+            self.output_tokens += _get(usage, "candidates_token_count", 0) or 0
+        return self
+
+    def merge(self, other: "TokenUsage") -> "TokenUsage":
+        self.calls += other.calls
+        self.input_tokens += other.input_tokens
+        self.cached_tokens += other.cached_tokens
+        self.output_tokens += other.output_tokens
+        return self
+
+    @property
+    def cached_ratio(self) -> float:
+        return self.cached_tokens / self.input_tokens if self.input_tokens else 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def summary(self) -> str:
+        return (
+            f"{self.calls} calls, {self.input_tokens} input tokens "
+            f"({self.cached_tokens} cached, {self.cached_ratio:.0%}), {self.output_tokens} output tokens"
+        )
@@ -0,0 +1,337 @@
+# This script runs an HTTP service that generates deep research reports on demand
+# Internal tools submit a topic and date window, then poll for the job status and result
+# Identical requests that are already running share a single deep research call
+
+import argparse
+import asyncio
+import json
+import uuid
+import warnings
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from openai import OpenAI
+from config.settings import get_settings
+from deep_research_bot import get_date_window, run_deep_research
+from pipeline.deadline import Deadline
+from reports.sections import SectionStore
+
+# Suppress the LibreSSL warning
+warnings.filterwarnings('ignore', message='.*LibreSSL.*')
+
+MAX_BODY_BYTES = 64 * 1024
+IDLE_TIMEOUT = 30
+MAX_FINISHED_JOBS = 1000
+
+_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+@dataclass
+class ReportJob:
+    """A report request and its outcome"""
+    job_id: str
+    topic: str
+    start_date: str
+    end_date: str
+    status: str = "pending"
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    finished_at: Optional[str] = None
+    requests: int = 1
+    report: Optional[dict] = None
+    report_text: Optional[str] = None
+    html_content: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_status(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "topic": self.topic,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "requests": self.requests,
+            "status_url": f"/reports/{self.job_id}",
+            "result_url": f"/reports/{self.job_id}/result",
+            "error": self.error,
+        }
+
+
+class ReportService:
+    """Runs report jobs, coalescing identical in-flight requests into one research call"""
+
+    def __init__(self, client: OpenAI, max_concurrent_runs: int = 4, deadline_seconds: Optional[float] = None,
+                 section_cache_dir: Optional[str] = None):
+        self.client = client
+        self.deadline_seconds = deadline_seconds
+        self.section_store = SectionStore(section_cache_dir) if section_cache_dir else None
+        self.jobs: Dict[str, ReportJob] = {}
+        self._in_flight: Dict[Tuple[str, str, str], ReportJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._run_slots = asyncio.Semaphore(max_concurrent_runs)
+
+    @staticmethod
+    def _request_key(topic: str, start_date: str, end_date: str) -> Tuple[str, str, str]:
+        return " ".join(topic.lower().split()), start_date, end_date
+
+    def submit(self, topic: str, start_date: str, end_date: str) -> ReportJob:
+        """
+        Submit a report request, joining an identical in-flight job if there is one
+
+        Args:
+            topic: The research topic
+            start_date: Start of the research window (YYYY-MM-DD)
+            end_date: End of the research window (YYYY-MM-DD)
+
+        Returns:
+            ReportJob: The new or already running job
+        """
+        key = self._request_key(topic, start_date, end_date)
+        job = self._in_flight.get(key)
+        if job is not None:
+            job.requests += 1
+            return job
+
+        job = ReportJob(job_id=uuid.uuid4().hex, topic=topic, start_date=start_date, end_date=end_date)
+        self.jobs[job.job_id] = job
+        self._in_flight[key] = job
+        task = asyncio.create_task(self._run(key, job))
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.job_id, None))
+        self._evict_finished()
+        return job
+
+    async def _run(self, key: Tuple[str, str, str], job: ReportJob):
+        # The deadline covers time spent queued for a run slot as well as the run itself
+        deadline = Deadline(self.deadline_seconds)
+        try:
+            async with self._run_slots:
+                deadline.check("start the research run")
+                job.status = "running"
+                worker = asyncio.ensure_future(asyncio.to_thread(
+                    run_deep_research,
+                    self.client, job.topic, job.start_date, job.end_date, deadline, self.section_store
+                ))
+                try:
+                    report, html_content = await asyncio.wait_for(asyncio.shield(worker), timeout=deadline.wait_timeout())
+                except asyncio.TimeoutError:
+                    # The thread cannot be interrupted and stops on its own request timeout;
+                    # fail the job now but keep the run slot until the thread has returned,
+                    # so there are never more research threads than max_concurrent_runs
+                    self._finish(key, job, error=f"Deadline of {deadline.seconds:.0f}s exceeded")
+                    await asyncio.wait([worker])
+                    return
+            job.report = report.to_dict()
+            job.report_text = report.to_text()
+            job.html_content = html_content
+            self._finish(key, job)
+        except Exception as e:
+            self._finish(key, job, error=str(e))
+        finally:
+            if job.finished_at is None:
+                self._finish(key, job, error="Cancelled")
+
+    def _finish(self, key: Tuple[str, str, str], job: ReportJob, error: Optional[str] = None):
+        """Record a job's outcome and stop routing new requests to it"""
+        job.status = "failed" if error else "completed"
+        job.error = error
+        job.finished_at = datetime.now().isoformat(timespec="seconds")
+        self._in_flight.pop(key, None)
+
+    def _evict_finished(self):
+        """Drop the oldest finished jobs once the history grows too large"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished_at]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    async def shutdown(self):
+        """Cancel any running jobs"""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+
+class ReportHTTPServer:
+    """Minimal asyncio HTTP/1.1 server exposing the report service as JSON"""
+
+    def __init__(self, service: ReportService):
+        self.service = service
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on a connection until the client closes it or goes idle"""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, keep_alive=False)
+                    break
+                method, path, version = parts
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+                status, payload = self.route(method.upper(), path.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool):
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    def route(self, method: str, path: str, body: bytes) -> Tuple[int, dict]:
+        """
+        Dispatch a request to the matching endpoint
+
+        Endpoints:
+            POST /reports                  submit {"topic", "start_date"?, "end_date"?, "days"?}
+            GET  /reports/<job_id>         job status
+            GET  /reports/<job_id>/result  structured report, text and HTML once completed
+            GET  /health                   liveness check
+        """
+        segments = [segment for segment in path.split("/") if segment]
+
+        if segments == ["health"]:
+            return 200, {"status": "ok", "jobs": len(self.service.jobs)}
+
+        if segments == ["reports"]:
+            if method != "POST":
+                return 405, {"error": "use POST to submit a report request"}
+            return self._submit(body)
+
+        if len(segments) in (2, 3) and segments[0] == "reports":
+            if method != "GET":
+                return 405, {"error": "use GET to poll a report"}
+            job = self.service.jobs.get(segments[1])
+            if job is None:
+                return 404, {"error": "unknown job id"}
+            if len(segments) == 2:
+                return 200, job.to_status()
+            if segments[2] == "result":
+                return self._result(job)
+
+        return 404, {"error": "not found"}
+
+    def _submit(self, body: bytes) -> Tuple[int, dict]:
+        try:
+            request = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            return 400, {"error": "request body must be JSON"}
+
+        topic = request.get("topic") if isinstance(request, dict) else None
+        if not isinstance(topic, str) or not topic.strip():
+            return 400, {"error": "topic is required"}
+
+        try:
+            default_start, default_end = get_date_window(int(request.get("days", 7)))
+            start_date = request.get("start_date") or default_start
+            end_date = request.get("end_date") or default_end
+            for value in (start_date, end_date):
+                datetime.strptime(value, "%Y-%m-%d")
+        except (TypeError, ValueError):
+            return 400, {"error": "dates must be YYYY-MM-DD and days an integer"}
+
+        job = self.service.submit(topic.strip(), start_date, end_date)
+        return 202, job.to_status()
+
+    def _result(self, job: ReportJob) -> Tuple[int, dict]:
+        if job.status == "completed":
+            return 200, {
+                "job_id": job.job_id,
+                "status": job.status,
+                "topic": job.topic,
+                "report": job.report,
+                "report_text": job.report_text,
+                "html_content": job.html_content,
+            }
+        if job.status == "failed":
+            return 500, job.to_status()
+        return 202, job.to_status()
+
+
+async def serve(host: str, port: int, max_concurrent_runs: int):
+    """Start the report service and serve until cancelled"""
+    settings = get_settings()
+    service = ReportService(
+        OpenAI(api_key=settings.openai.api_key, max_retries=0),
+        max_concurrent_runs,
+        settings.run_deadline_seconds,
+        settings.section_cache_dir
+    )
+    http_server = ReportHTTPServer(service)
+    server = await asyncio.start_server(http_server.handle_connection, host, port, backlog=4096)
+
+    print(f"🚀 Report service listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.shutdown()
+
+
+def main():
+    """Parse arguments and run the report service"""
+    parser = argparse.ArgumentParser(description="Serve deep research reports over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument(
+        "--max-concurrent-runs",
+        type=int,
+        default=4,
+        help="Maximum number of deep research calls running at once (default: 4)"
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_concurrent_runs))
+    except KeyboardInterrupt:
+        print("\n👋 Report service stopped")
+
+
+if __name__ == "__main__":
+    main()
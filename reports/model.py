@@ -0,0 +1,169 @@
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Union
+
+
+_SOURCE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string", "description": "Publisher or article title"},
+        "url": {"type": "string", "description": "Absolute URL of the source"},
+    },
+    "required": ["title", "url"],
+    "additionalProperties": False,
+}
+
+# JSON schema for structured report output, compatible with OpenAI strict mode
+REPORT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string", "description": "Title of the report"},
+        "headlines": {
+            "type": "array",
+            "description": "Top headlines, most significant first",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "headline": {"type": "string", "description": "Headline of the story"},
+                    "summary": {"type": "string", "description": "One sentence summary"},
+                    "analysis": {"type": "string", "description": "Analysis of the story, plain text"},
+                    "sources": {"type": "array", "items": _SOURCE_SCHEMA},
+                },
+                "required": ["headline", "summary", "analysis", "sources"],
+                "additionalProperties": False,
+            },
+        },
+        "takeaways": {
+            "type": "array",
+            "description": "Key takeaways across the stories",
+            "items": {"type": "string"},
+        },
+    },
+    "required": ["title", "headlines", "takeaways"],
+    "additionalProperties": False,
+}
+
+
+@dataclass
+class Source:
+    """A citation supporting a headline"""
+    title: str
+    url: str
+
+
+@dataclass
+class Headline:
+    """One story of the report"""
+    headline: str
+    summary: str
+    analysis: str
+    sources: List[Source] = field(default_factory=list)
+
+    @property
+    def section_hash(self) -> str:
+        """
+        Content hash of this section
+
+        Whitespace is normalised so that reformatting alone does not change the
+        hash; any change to the wording or the sources does.
+        """
+        canonical = json.dumps(
+            [
+                " ".join(self.headline.split()),
+                " ".join(self.summary.split()),
+                " ".join(self.analysis.split()),
+                [[" ".join(source.title.split()), source.url.strip()] for source in self.sources],
+            ],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class Report:
+    """A newsletter report: title, headline sections and takeaways"""
+    title: str
+    headlines: List[Headline]
+    takeaways: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+
+    def to_text(self) -> str:
+        """Plain text version of the report for the console and email fallback"""
+        lines = [self.title, ""]
+        for i, headline in enumerate(self.headlines, 1):
+            lines.append(f"{i}. {headline.headline}")
+            lines.append(headline.summary)
+            lines.append("")
+            lines.append(headline.analysis)
+            for source in headline.sources:
+                lines.append(f"- {source.title}: {source.url}")
+            lines.append("")
+        if self.takeaways:
+            lines.append("Key takeaways")
+            lines.extend(f"- {takeaway}" for takeaway in self.takeaways)
+        return "\n".join(lines).strip()
+
+
+def _require(data: Dict[str, Any], key: str, kind: type, where: str):
+    value = data.get(key)
+    if not isinstance(value, kind):
+        raise ValueError(f"{where}.{key} must be a {kind.__name__}")
+    return value
+
+
+def parse_report(data: Union[str, Dict[str, Any]]) -> Report:
+    """
+    Parse and validate structured report output
+
+    Args:
+        data: JSON text or the decoded object, following REPORT_SCHEMA
+
+    Returns:
+        Report: The typed report
+
+    Raises:
+        ValueError: If the data is not valid JSON or does not match the schema
+    """
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Report is not valid JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("Report must be a JSON object")
+
+    headlines = []
+    for i, item in enumerate(_require(data, "headlines", list, "report")):
+        where = f"report.headlines[{i}]"
+        if not isinstance(item, dict):
+            raise ValueError(f"{where} must be an object")
+        sources = []
+        for j, source in enumerate(_require(item, "sources", list, where)):
+            if not isinstance(source, dict):
+                raise ValueError(f"{where}.sources[{j}] must be an object")
+            sources.append(Source(
+                title=_require(source, "title", str, f"{where}.sources[{j}]").strip(),
+                url=_require(source, "url", str, f"{where}.sources[{j}]").strip(),
+            ))
+        headlines.append(Headline(
+            headline=_require(item, "headline", str, where).strip(),
+            summary=_require(item, "summary", str, where).strip(),
+            analysis=_require(item, "analysis", str, where).strip(),
+            sources=sources,
+        ))
+
+    takeaways = _require(data, "takeaways", list, "report")
+    if not all(isinstance(takeaway, str) for takeaway in takeaways):
+        raise ValueError("report.takeaways must be a list of strings")
+
+    return Report(
+        title=_require(data, "title", str, "report").strip(),
+        headlines=headlines,
+        takeaways=[takeaway.strip() for takeaway in takeaways],
+    )
@@ -0,0 +1,72 @@
+import os
+from typing import List, Optional
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from pipeline.deadline import Deadline
+from .model import Headline, Report
+from .sections import SectionStore, validate_sources
+
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), '..', 'templates')
+
+_environment = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+
+def render_section(headline: Headline, sources=None) -> str:
+    """
+    Render one headline section
+
+    Args:
+        headline: Headline section
+        sources: Validated citations to show instead of the headline's own
+
+    Returns:
+        str: Section HTML
+    """
+    paragraphs = [paragraph.strip() for paragraph in headline.analysis.split("\n\n") if paragraph.strip()]
+    return _environment.get_template("report_section.html").render(
+        headline=headline,
+        paragraphs=paragraphs,
+        sources=headline.sources if sources is None else sources,
+    )
+
+
+def render_report_html(report: Report, store: Optional[SectionStore] = None, check_links: bool = True,
+                       deadline: Optional[Deadline] = None, trace: Optional[List[dict]] = None) -> str:
+    """
+    Render a report as the HTML content of the newsletter email
+
+    Sections found in the store by content hash are reused as they are; new
+    sections have their citations validated, are rendered and are stored.
+
+    Args:
+        report: The structured report
+        store: Section store to reuse and record rendered sections, or None
+        check_links: Whether to request each new citation URL
+        deadline: Run deadline bounding the link checks
+        trace: Sub-story trace records of a parallel run, listed after the takeaways
+
+    Returns:
+        str: HTML formatted report
+    """
+    sections = []
+    reused = 0
+    for headline in report.headlines:
+        entry = store.get(headline) if store is not None else None
+        if entry is not None:
+            sections.append(entry["html"])
+            reused += 1
+            continue
+        sources = validate_sources(headline.sources, check_links, deadline)
+        html = render_section(headline, sources)
+        if store is not None:
+            store.put(headline, sources, html)
+        sections.append(html)
+
+    if store is not None:
+        print(f"♻️  Reused {reused} of {len(report.headlines)} report sections")
+    return _environment.get_template("report_body.html").render(report=report, sections=sections, trace=trace)
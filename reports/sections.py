@@ -0,0 +1,131 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+import requests
+from pipeline.checkpoint import atomic_write_text
+from pipeline.deadline import Deadline, DeadlineExceeded
+from .model import Headline, Source
+
+
+# Upper bound for checking a single citation URL
+CITATION_TIMEOUT = 10
+
+# Statuses meaning the cited page is definitely gone; anything else (including
+# network errors and bot protection) keeps the citation
+_DEAD_LINK_STATUSES = {404, 410}
+
+
+def _is_well_formed(url: str) -> bool:
+    parts = urlsplit(url)
+    return parts.scheme in ("http", "https") and bool(parts.netloc) and " " not in url
+
+
+def _is_dead_link(session: requests.Session, url: str, deadline: Deadline) -> bool:
+    timeout = deadline.timeout(cap=CITATION_TIMEOUT, action="check a citation")
+    response = session.head(url, timeout=timeout, allow_redirects=True)
+    if response.status_code in (403, 405, 501):
+        # Some servers reject HEAD; fall back to a GET without reading the body
+        response = session.get(url, timeout=timeout, allow_redirects=True, stream=True)
+        response.close()
+    return response.status_code in _DEAD_LINK_STATUSES
+
+
+def validate_sources(sources: List[Source], check_links: bool = True,
+                     deadline: Optional[Deadline] = None) -> List[Source]:
+    """
+    Validate the citations of a section
+
+    Malformed and duplicate URLs are dropped. When `check_links` is set, the
+    remaining URLs are checked in parallel and pages the server reports as gone
+    are dropped too; checks that fail or run out of time keep the citation.
+
+    Args:
+        sources: Citations as returned by the model
+        check_links: Whether to request each URL
+        deadline: Run deadline bounding the link checks
+
+    Returns:
+        list: Valid citations in their original order
+    """
+    seen = set()
+    candidates = []
+    for source in sources:
+        if not _is_well_formed(source.url) or source.url in seen:
+            continue
+        seen.add(source.url)
+        candidates.append(source)
+    if not check_links or not candidates:
+        return candidates
+    deadline = deadline or Deadline()
+
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+        futures = [executor.submit(_is_dead_link, session, source.url, deadline) for source in candidates]
+        wait(futures, timeout=deadline.wait_timeout())
+        valid = []
+        for source, future in zip(candidates, futures):
+            if future.done():
+                try:
+                    if future.result():
+                        print(f"⚠️  Dropping dead citation {source.url}")
+                        continue
+                except (requests.RequestException, DeadlineExceeded):
+                    pass
+            else:
+                future.cancel()
+            valid.append(source)
+    return valid
+
+
+class SectionStore:
+    """
+    On-disk store of rendered report sections, keyed by the section's content hash
+
+    Each entry holds the section's validated citations and its rendered HTML, so a
+    later edition that repeats an unchanged headline section reuses both instead of
+    checking the links and rendering it again.
+    """
+
+    def __init__(self, root: str = "sections"):
+        self.root = root
+
+    def path(self, section_hash: str) -> str:
+        return os.path.join(self.root, f"{section_hash}.json")
+
+    def get(self, headline: Headline) -> Optional[Dict]:
+        """
+        Look up a stored section
+
+        Args:
+            headline: Headline section to look up by content hash
+
+        Returns:
+            dict: Entry with "sources" and "html", or None if the section is not stored
+        """
+        try:
+            with open(self.path(headline.section_hash), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        entry["sources"] = [Source(**source) for source in entry.get("sources", [])]
+        return entry
+
+    def put(self, headline: Headline, sources: List[Source], html: str):
+        """
+        Store a section's validated citations and rendered HTML
+
+        Args:
+            headline: Headline section as returned by the model
+            sources: Its validated citations
+            html: Its rendered HTML
+        """
+        os.makedirs(self.root, exist_ok=True)
+        atomic_write_text(self.path(headline.section_hash), json.dumps({
+            "hash": headline.section_hash,
+            "headline": headline.headline,
+            "sources": [{"title": source.title, "url": source.url} for source in sources],
+            "html": html,
+            "stored_at": datetime.now().isoformat(),
+        }, ensure_ascii=False))
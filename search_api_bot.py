@@ -4,12 +4,21 @@
 
 import os
 import getpass
+import json
 from dotenv import load_dotenv
-import requests
 import warnings
 from datetime import datetime, timedelta
 from google import genai
 from google.genai import types
+from news_search.expansion import suggest_related_terms
+from news_search.planner import plan_aliases, plan_queries, split_aliases
+from news_search.fetch import fetch_all
+from news_search.ranking import rank_articles
+from pipeline.deadline import Deadline
+from prompts import newsletter as prompts
+from prompts.caching import get_gemini_cache
+from prompts.usage import TokenUsage
+from reports.model import REPORT_SCHEMA, parse_report
 
 # Suppress the LibreSSL warning
 warnings.filterwarnings('ignore', message='.*LibreSSL.*')
@@ -41,18 +50,22 @@ if not GOOGLE_API_KEY:
 if not NEWS_API_KEY:
     raise ValueError("News API key is required. Please set NEWS_API_KEY in your .env file or provide it when prompted.")
 
+# Number of ranked articles passed to the model
+TOP_K_ARTICLES = 20
+
+# Hard upper bound on the run's wall time in seconds (0 disables the deadline)
+RUN_DEADLINE_SECONDS = float(os.getenv("RUN_DEADLINE_SECONDS", "300"))
+
+# Upper bound for the Gemini request
+GENERATE_TIMEOUT = 120
+
 # Get the latest news on the user's provided topic
-topic = input("Enter a topic to research: ")
+# Aliases can be listed after the topic, separated by commas
+topic = input("Enter a topic to research (optionally followed by comma-separated aliases): ")
 date = datetime.now() - timedelta(days=1)
 date_formatted = date.strftime("%Y-%m-%d")
-
-url = ('https://newsapi.org/v2/everything?'
-       f'q={topic}&'
-       f'from={date_formatted}&'
-       'sortBy=popularity&'
-       f'apiKey={NEWS_API_KEY}')
-
-response = requests.get(url)
+deadline = Deadline(RUN_DEADLINE_SECONDS)
+usage = TokenUsage()
 
 # Initialize the  model
 client = genai.Client(
@@ -60,29 +73,50 @@ client = genai.Client(
 )
 model = "gemini-2.5-flash"
 
-system_instruction = """
-You are a professional journalist and researcher preparing a structured, data-driven report on behalf of your client. 
-
-You will be given a json object with the following containing news articles on the user's provided topic.
-
-Your task is to summarize the news articles in a newsletter style report.
-
-The report should be in the following format:
-- Title of the report
-- Top 3 headlines with 1 sentence summary
-- For each headline topic, 1-2 paragraphs of analysis
-- Key takeaways
-- Sources
-"""
-
-user_query = str(response.json())
+# Expand the topic into sub-queries and fetch them in parallel
+# Aliases listed by the user replace the automatically suggested related terms
+related = suggest_related_terms(client, topic, deadline, usage) if len(split_aliases(topic)) == 1 else []
+queries = plan_queries(topic, related=related)
+print(f"🔎 Searching {len(queries)} queries: {', '.join(queries)}")
+articles = fetch_all(NEWS_API_KEY, queries, date_formatted, deadline=deadline)
+
+# Rank the merged articles by relevance to the topic and every alias it was searched under,
+# and keep only the best ones for the prompt
+top_articles = rank_articles(" ".join(plan_aliases(topic, related)), articles, top_k=TOP_K_ARTICLES)
+print(f"📰 Kept {len(top_articles)} of {len(articles)} articles")
+
+# Reuse a context cache for the stable instructions when the prefix is large enough to be cached
+cached_content = get_gemini_cache(client, model, prompts.NEWS_SUMMARY, deadline=deadline)
+
+user_query = json.dumps([
+    {
+        "title": article.get("title"),
+        "source": (article.get("source") or {}).get("name"),
+        "publishedAt": article.get("publishedAt"),
+        "description": article.get("description"),
+        "url": article.get("url"),
+    }
+    for article in top_articles
+], ensure_ascii=False)
 
 response = client.models.generate_content(
     model=model,
     config=types.GenerateContentConfig(
-        system_instruction=system_instruction
+        # A cache already carries the system instruction; otherwise send it first, unchanged
+        # between runs, so Gemini's implicit caching can match the prefix
+        system_instruction=None if cached_content else prompts.NEWS_SUMMARY.text,
+        cached_content=cached_content,
+        # Ask for JSON matching the report schema instead of free-form prose
+        response_mime_type="application/json",
+        response_json_schema=REPORT_SCHEMA,
+        # HttpOptions.timeout is in milliseconds
+        http_options=types.HttpOptions(
+            timeout=int(deadline.timeout(cap=GENERATE_TIMEOUT, action="call Gemini") * 1000)
+        )
     ),
     contents=user_query
 )
 
-print(response.text)
\ No newline at end of file
+report = parse_report(response.text)
+print(report.to_text())
+print(f"💾 Tokens: {usage.add_gemini(response).summary()}")
\ No newline at end of file
@@ -8,6 +8,8 @@ import os
 from dotenv import load_dotenv
 from email_service.email_manager import EmailManager
 from config.email_config import print_email_setup_instructions
+from reports.model import parse_report
+from reports.render import render_report_html
 
 # Load environment variables
 load_dotenv()
@@ -29,7 +31,7 @@ def test_email_functionality():
     print("✅ Email configuration found")
     
     # Test connection
-    print("🔗 Testing connection to Resend...")
+    print("🔗 Testing connection to the email service...")
     if email_manager.test_connection():
         print("✅ Connection successful!")
     else:
@@ -39,28 +41,37 @@ def test_email_functionality():
     # Test email sending
     print("📧 Sending test email...")
     
-    # Test with markdown content that includes links
-    test_content = """
-    # AI Research Report
-
-    - **DeepMind's Gemini AI clinches gold at International Mathematical Olympiad** ([www.reuters.com](https://www.reuters.com/technology/ai-intelligencer-how-ai-won-math-gold-2025-07-24/#:~:text=In%20July%202025%2C%20Google%20DeepMind,benchmark%20for%20true%20AI%20reasoning)).
-
-    This is a **bold text** with *italic text* and some `code` formatting.
-
-    Here's another link: [OpenAI](https://openai.com) and [Google](https://google.com).
-
-    1. **First headline** with a link to [GitHub](https://github.com)
-    2. **Second headline** with *emphasis* and `inline code`
-    """
-    
-    # Import the formatting function from the main bot
-    from deep_research_bot import format_report_for_email
+    # Test with a structured report rendered the same way as a real run
+    test_report = parse_report({
+        "title": "AI Research Report",
+        "headlines": [
+            {
+                "headline": "DeepMind's Gemini AI clinches gold at International Mathematical Olympiad",
+                "summary": "An AI system reached gold-medal level on the olympiad's problems for the first time.",
+                "analysis": "This is the first paragraph of analysis.\n\nThis is a second paragraph, with <escaped> & markup.",
+                "sources": [
+                    {
+                        "title": "Reuters",
+                        "url": "https://www.reuters.com/technology/ai-intelligencer-how-ai-won-math-gold-2025-07-24/"
+                    },
+                    {"title": "Google DeepMind", "url": "https://deepmind.google"}
+                ]
+            },
+            {
+                "headline": "Second headline",
+                "summary": "A headline without sources.",
+                "analysis": "Short analysis.",
+                "sources": []
+            }
+        ],
+        "takeaways": ["First takeaway", "Second takeaway"]
+    })
     
-    # Format the content for email
-    formatted_content = format_report_for_email(test_content)
+    # Render the report the same way the bot does, without touching the section cache
+    formatted_content = render_report_html(test_report)
     
     success = email_manager.send_research_report(
-        topic="Markdown Test",
+        topic="Structured Report Test",
         date="2024-01-01",
         content=formatted_content
     )
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled SMTP backend
+Runs against a local aiosmtpd server, so no email account is needed
+"""
+
+import socket
+import time
+from aiosmtpd.controller import Controller
+from email_service.base import EmailConfig, EmailContent
+from email_service.smtp_service import SMTPConfig, SMTPEmailService
+
+REJECTED_RECIPIENT = "rejected@example.com"
+
+
+class RecordingHandler:
+    """aiosmtpd handler that records messages and refuses one recipient"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == REJECTED_RECIPIENT:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.mail_from, list(envelope.rcpt_tos)))
+        return "250 Message accepted for delivery"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port: int):
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller, handler
+
+
+def _make_service(port: int):
+    """Create a service and count the connections it opens"""
+    service = SMTPEmailService(
+        EmailConfig(api_key=None, from_email="bot@example.com", from_name="Deep Research Bot"),
+        SMTPConfig(host="127.0.0.1", port=port, starttls=False, pool_size=2)
+    )
+    opened = []
+    connect = service._connect
+
+    def counting_connect(timeout=None):
+        connection = connect(timeout)
+        opened.append(connection)
+        return connection
+
+    service._connect = counting_connect
+    return service, opened
+
+
+CONTENT = EmailContent(subject="SMTP pool test", html_content="<p>Hello</p>", text_content="Hello")
+
+
+def test_pool_reuse():
+    """Sequential sends share one connection"""
+    port = _free_port()
+    controller, handler = _start_server(port)
+    service, opened = _make_service(port)
+    try:
+        results = [service.send_email("reader@example.com", CONTENT) for _ in range(10)]
+        assert all(results)
+        assert len(handler.messages) == 10
+        assert len(opened) == 1
+    finally:
+        service.close()
+        controller.stop()
+
+
+def test_reconnect_after_server_drop():
+    """A send after the server restarted reconnects and succeeds"""
+    port = _free_port()
+    controller, handler = _start_server(port)
+    service, opened = _make_service(port)
+    try:
+        assert service.send_email("reader@example.com", CONTENT)
+        controller.stop()
+        controller, handler = _start_server(port)
+        assert service.send_email("reader@example.com", CONTENT)
+        assert len(handler.messages) == 1
+        assert len(opened) == 2
+    finally:
+        service.close()
+        controller.stop()
+
+
+def test_rejected_recipient():
+    """A refused recipient fails once, without a resend or a new connection"""
+    port = _free_port()
+    controller, handler = _start_server(port)
+    service, opened = _make_service(port)
+    try:
+        assert not service.send_email(REJECTED_RECIPIENT, CONTENT)
+        assert service.send_email("reader@example.com", CONTENT)
+        assert handler.messages == [("bot@example.com", ["reader@example.com"])]
+        assert len(opened) == 1
+    finally:
+        service.close()
+        controller.stop()
+
+
+def test_send_timeout_when_pool_busy():
+    """A send gives up at its timeout while every pooled connection is in use"""
+    port = _free_port()
+    controller, handler = _start_server(port)
+    service, opened = _make_service(port)
+    busy = [service._acquire(), service._acquire()]
+    try:
+        started = time.monotonic()
+        assert not service.send_email("reader@example.com", CONTENT, timeout=0.5)
+        assert time.monotonic() - started < 2
+        assert handler.messages == []
+    finally:
+        for connection in busy:
+            service._release(connection)
+        service.close()
+        controller.stop()
+
+
+def main():
+    """Run each check and report the result"""
+    print("🧪 Testing the SMTP backend against a local aiosmtpd server")
+    print("="*50)
+    passed = True
+    for check in (test_pool_reuse, test_reconnect_after_server_drop, test_rejected_recipient,
+                  test_send_timeout_when_pool_busy):
+        try:
+            check()
+            print(f"✅ {check.__doc__}")
+        except AssertionError:
+            passed = False
+            print(f"❌ {check.__doc__}")
+    return passed
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if main() else 1)